@@ -39,12 +39,22 @@ from .properties import (
     RelativeOffsetReferenceProperty,
 )
 from .binding import (
+    BindingEngine,
     BindingContext,
     BackedBindingContext,
+    VirtualArray,
 )
 from .factory import (
     TemplateFactory,
 )
+from .compiler import (
+    TemplateCompiler,
+    CompiledParser,
+)
+from .batch import (
+    BatchResult,
+    bind_many,
+)
 from .template_provider import (
     TemplateProviderBase,
     TemplateProvider,
@@ -53,9 +63,22 @@ from .template_provider import (
 from .data_provider import (
     DataProviderBase,
     DataProvider,
+    MmapDataProvider,
+    PositionalDataProvider,
+    CachedDataProvider,
+    OverlayDataProvider,
+    WriteBackDataProvider,
     BufferedIODataProvider,
     ZeroedDataProvider,
 )
+from .streaming import (
+    StreamDataProvider,
+    stream_records,
+)
+from .aio import (
+    AsyncDataProviderBase,
+    ThreadPoolDataProvider,
+)
 from .value_provider import (
     ValueProviderBase,
     ValueProvider,
@@ -70,4 +93,6 @@ from .utils import (
     siblings,
     rightsiblings,
     leftsiblings,
+    rightsibling,
+    leftsibling,
 )
\ No newline at end of file
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.aio
+    ~~~~~~~~~~~~~~~~~~
+
+    This module implements data providers for :mod:`asyncio`.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import asyncio
+import threading
+
+
+class AsyncDataProviderBase(object):
+    """The base class of data providers that read and write data without
+    blocking the event loop.
+    """
+
+    async def read(self, template):
+        pass
+
+    async def read_many(self, templates):
+        """Reads the data of the given templates concurrently. Returns a list
+        of the values in the order of the templates.
+        """
+        return list(await asyncio.gather(
+            *(self.read(template) for template in templates)
+        ))
+
+    async def write(self, template, value):
+        pass
+
+
+class ThreadPoolDataProvider(AsyncDataProviderBase):
+    """Adapts a synchronous :class:`~binalyzer.DataProvider` to
+    :mod:`asyncio` by running its reads and writes in a thread pool.
+
+    The layout of the templates is resolved on the event loop, only the I/O
+    is carried out in the thread pool. Calls to data providers that are not
+    :attr:`~binalyzer.DataProviderBase.thread_safe` are serialized.
+
+    .. note:: Only calls made through the adapter are serialized. Reading or
+              writing :attr:`~binalyzer.Template.value` of templates bound to
+              the same data provider is not safe while asynchronous calls
+              are pending, unless the data provider is thread-safe, see
+              :class:`~binalyzer.PositionalDataProvider`.
+
+    :param data_provider: the synchronous data provider to adapt
+    :param executor: the :class:`~concurrent.futures.Executor` to run the I/O
+                     in, the default executor of the event loop if
+                     :const:`None`
+    """
+
+    def __init__(self, data_provider, executor=None):
+        #: The synchronous data provider that is adapted.
+        self.data_provider = data_provider
+
+        #: The executor the I/O is carried out in.
+        self.executor = executor
+
+        self._lock = threading.Lock()
+
+    async def read(self, template):
+        self._resolve(template)
+        return await self._run(self.data_provider.read, template)
+
+    async def read_many(self, templates):
+        """Reads the data of the given templates in a single call to
+        :meth:`~binalyzer.DataProviderBase.read_many`, which merges adjacent
+        ranges.
+        """
+        templates = list(templates)
+        for template in templates:
+            self._resolve(template)
+        return await self._run(self.data_provider.read_many, templates)
+
+    async def write(self, template, value):
+        self._resolve(template)
+        await self._run(self.data_provider.write, template, value)
+
+    def _resolve(self, template):
+        # Templates are not thread-safe, hence their layout is resolved and
+        # cached on the event loop before the data provider accesses it.
+        template.absolute_address  # pylint: disable=pointless-statement
+        template.size  # pylint: disable=pointless-statement
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        if self.data_provider.thread_safe:
+            return await loop.run_in_executor(self.executor, function, *args)
+        return await loop.run_in_executor(self.executor, self._run_locked,
+                                          function, *args)
+
+    def _run_locked(self, function, *args):
+        with self._lock:
+            return function(*args)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.batch
+    ~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the binding of a template to many files using a
+    pool of worker processes.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import io
+import os
+import collections
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from anytree import PreOrderIter
+
+from .binalyzer import Binalyzer
+from .compiler import (
+    CompiledParser,
+    TemplateCompiler,
+)
+from .factory import TemplateFactory
+from .properties import ValueProperty
+
+
+#: The result of binding a file. Either `result` holds the value extracted
+#: from the file, or `error` the exception that occurred.
+BatchResult = collections.namedtuple('BatchResult', ['path', 'result', 'error'])
+
+
+def bind_many(template, paths, workers=None, extract=None, max_pending=None,
+              byteorder='little'):
+    """Binds the template to each of the given files in parallel and yields a
+    :class:`BatchResult` per file in the order of the paths.
+
+    Templates whose layout is fixed are bound once and compiled into a
+    :class:`~binalyzer.CompiledParser`, which is sent to each worker process
+    once. Files are decoded into nested dictionaries as returned by
+    :meth:`~binalyzer.CompiledParser.parse`, which are passed to `extract`
+    within the worker if given. Templates whose counts, offsets or sizes
+    depend on data, or that have signatures, cannot be compiled. They are
+    pickled instead and bound to each file, the leaves of the bound template
+    are decoded alike.
+
+    At most `max_pending` files are processed ahead of the consumer of the
+    results. Errors are reported per file. If a worker process dies, the pool
+    is recreated and the file that was processed is bound on its own, to
+    tell whether it caused the failure.
+
+    :param template: the template to bind the files to
+    :param paths: an iterable of paths of the files
+    :param workers: the number of worker processes, the number of processors
+                    if :const:`None`
+    :param extract: a picklable function extracting the result from the
+                    decoded data of a file
+    :param max_pending: the maximum number of files processed at once,
+                        four times the number of workers if :const:`None`
+    :param byteorder: the byte order used to decode integers
+    """
+    parser = _create_parser(template, byteorder)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * workers
+    paths = iter(paths)
+    pending = collections.deque()
+    pool = _WorkerPool(workers, parser, extract)
+    try:
+        while True:
+            while len(pending) < max_pending:
+                path = next(paths, None)
+                if path is None:
+                    break
+                pending.append((path, pool.submit(path)))
+            if not pending:
+                break
+            (path, future) = pending.popleft()
+            try:
+                yield BatchResult(path, future.result(), None)
+            except BrokenProcessPool:
+                # The file is bound on its own to tell whether it broke the
+                # pool, before the other files are resubmitted.
+                pool.restart()
+                yield pool.bind_alone(path)
+                pending = collections.deque(
+                    (path, future if _has_completed(future)
+                     else pool.submit(path))
+                    for (path, future) in pending
+                )
+            except Exception as error:
+                yield BatchResult(path, None, error)
+    finally:
+        for (_, future) in pending:
+            future.cancel()
+        pool.shutdown()
+
+
+def _create_parser(template, byteorder):
+    # Binding expands and reduces templates according to their counts and
+    # validates signatures, which is done once for templates that do not
+    # depend on data. A clone is bound, so that neither the given template is
+    # bound nor its data is pickled.
+    template = TemplateFactory().clone(template)
+    for current in PreOrderIter(template):
+        if (not isinstance(current.count_property, ValueProperty) or
+                current.signature is not None):
+            return _TemplateParser(template, byteorder)
+    try:
+        return TemplateCompiler(byteorder).compile(Binalyzer(template).template)
+    except RuntimeError:
+        return _TemplateParser(template, byteorder)
+
+
+def _has_completed(future):
+    return (future.done() and not future.cancelled() and
+            not isinstance(future.exception(), BrokenProcessPool))
+
+
+class _WorkerPool(object):
+
+    def __init__(self, workers, parser, extract):
+        self._workers = workers
+        self._parser = parser
+        self._extract = extract
+        self._executor = self._create_executor()
+
+    def submit(self, path):
+        return self._executor.submit(_bind_file, path, self._extract)
+
+    def bind_alone(self, path):
+        try:
+            return BatchResult(path, self.submit(path).result(), None)
+        except BrokenProcessPool as error:
+            self.restart()
+            return BatchResult(path, None, error)
+        except Exception as error:
+            return BatchResult(path, None, error)
+
+    def restart(self):
+        self._executor.shutdown(wait=False)
+        self._executor = self._create_executor()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self._workers,
+                                   initializer=_initialize_worker,
+                                   initargs=(self._parser,))
+
+
+class _TemplateParser(object):
+    # Decodes data by binding a template to it, for templates that cannot be
+    # compiled.
+
+    def __init__(self, template, byteorder):
+        self._template = template
+        self._byteorder = byteorder
+
+    def parse(self, data):
+        binalyzer = Binalyzer(self._template, io.BytesIO(data))
+        template = binalyzer.template
+        if template.absolute_address + template.size > len(data):
+            raise RuntimeError(
+                'Unable to parse buffer, it is smaller than the template.'
+            )
+        values = iter(template.unpack(self._byteorder))
+        return self._decode(template, values)
+
+    def _decode(self, template, values):
+        if template.is_leaf:
+            return next(values)
+        result = {}
+        for (index, child) in enumerate(template.children):
+            key = index if child.name is None else child.name
+            result[key] = self._decode(child, values)
+        return result
+
+
+_parser = None
+
+
+def _initialize_worker(parser):
+    global _parser
+    _parser = parser
+
+
+def _bind_file(path, extract):
+    with open(path, 'rb') as file:
+        if isinstance(_parser, CompiledParser):
+            # Only the data of the template is read.
+            file.seek(_parser.address)
+            result = _parser.parse(file.read(_parser.size), 0)
+        else:
+            result = _parser.parse(file.read())
+    if extract is not None:
+        result = extract(result)
+    return result
@@ -12,10 +12,15 @@ import io
 
 from typing import Optional
 
+from anytree import PreOrderIter
+
 from .binding import BindingContext
+from .factory import TemplateFactory
+from .template_engine import _template_engine
 from .template_provider import TemplateProvider
 from .template import Template
 from .data_provider import (
+    DataProviderBase,
     DataProvider,
     ZeroedDataProvider,
 )
@@ -31,24 +36,28 @@ class Binalyzer(object):
     for binding templates to binary data.
 
     :param template: a :class:`Template` that should be bound to binary data
-    :param data: a binary stream inheriting :class:`~io.IOBase`
+    :param data: a binary stream inheriting :class:`~io.IOBase` or a data
+                 provider inheriting :class:`~binalyzer.DataProviderBase`,
+                 e.g. a :class:`~binalyzer.MmapDataProvider`
     """
 
-    def __init__(self, template: Optional[Template] = None, data: Optional[io.IOBase] = None):
-        if data and template is None:
-            data.seek(0, 2)
+    def __init__(self, template: Optional[Template] = None, data=None):
+        if data is None:
+            data_provider = DataProvider(io.BytesIO())
+        elif isinstance(data, DataProviderBase):
+            data_provider = data
+        else:
+            data_provider = DataProvider(data)
+
+        if data is not None and template is None:
             template = Template()
-            template.size = data.tell()
-            data.seek(0)
-        
+            template.size = data_provider.size
+
         if template is None:
             template = Template()
 
-        if data is None:
-            data = io.BytesIO()
-
         self._binding_context = BindingContext(TemplateProvider(template),
-                                               DataProvider(data))
+                                               data_provider)
 
         #: A list of registered Binalyzer extensions.
         self.extensions = {}
@@ -59,8 +68,16 @@ class Binalyzer(object):
     def data(self):
         """A buffered or unbuffered binary stream that inherits :class:`~io.IOBase`.
         It is bound to the corresponding :attr:`~binalyzer.Binalyzer.template`.
+
+        Data smaller than the template is extended lazily. Pending extensions
+        are written once writable streams are accessed, other data is
+        extended by :meth:`flush` only.
         """
-        return self._binding_context.data
+        data = self._binding_context.data
+        writable = getattr(data, 'writable', None)
+        if writable is not None and writable():
+            self.data_provider.flush()
+        return data
 
     @data.setter
     def data(self, value: io.IOBase):
@@ -72,15 +89,13 @@ class Binalyzer(object):
         corresponding binary :attr:`~binalyzer.Binalyzer.data`.
         """
         template = self._binding_context.template
-        data_size = len(self.data_provider.data.getvalue())
+        data_size = self.data_provider.size
         template_size = self._binding_context.template.size
 
         if (data_size == 0):
             self.data_provider = ZeroedDataProvider(template_size)
         elif (data_size < template_size):
-            extension_size = template_size - data_size
-            self.data_provider.data.seek(0, 2)
-            self.data_provider.data.write(bytes(extension_size * [0x00]))
+            self.data_provider.ensure_size(template_size)
 
         return template
 
@@ -108,6 +123,86 @@ class Binalyzer(object):
     def data_provider(self, value):
         self._binding_context.data_provider = value
 
+    @property
+    def binding_engine(self):
+        """The :class:`~binalyzer.BindingEngine` that binds the
+        :attr:`~binalyzer.Binalyzer.template` to the
+        :attr:`~binalyzer.Binalyzer.data`.
+        """
+        return self._binding_context.binding_engine
+
+    @binding_engine.setter
+    def binding_engine(self, value):
+        self._binding_context.binding_engine = value
+
+    @property
+    def async_data_provider(self):
+        """The :class:`~binalyzer.aio.AsyncDataProviderBase` used to access
+        the :attr:`~binalyzer.Binalyzer.data` from :mod:`asyncio`.
+        """
+        return self._binding_context.async_data_provider
+
+    @async_data_provider.setter
+    def async_data_provider(self, value):
+        self._binding_context.async_data_provider = value
+
+    def flush(self):
+        """Writes the zeros the data is extended by to fit the
+        :attr:`template`, see :meth:`~binalyzer.DataProvider.ensure_size`.
+        """
+        self.data_provider.flush()
+
+    async def read_values(self, templates):
+        """Reads the values of the given templates concurrently without
+        blocking the event loop. Returns a list of the values in the order of
+        the templates.
+        """
+        return await self.async_data_provider.read_many(templates)
+
+    def iter_records(self, record_template, offset=0):
+        """Iterates the records the data consists of, starting at the given
+        offset. Each record is bound to the given template, the data is
+        expected to end with a complete record.
+
+        Records are bound one at a time, thus memory does not grow with the
+        size of the data. If the layout of the record template does not
+        depend on data and it has no signatures, a single bound record is
+        reused by moving it to the address of each record. Hence, a yielded
+        record is only valid until the next record is requested.
+
+        :param record_template: the template describing a record
+        :param offset: the address of the first record
+        """
+        data_provider = self.data_provider
+        data_size = data_provider.size
+        template = TemplateFactory().clone(record_template)
+        reusable = (_template_engine.has_fixed_layout(template) and
+                    not any(current.signature
+                            for current in PreOrderIter(template)))
+        record = None
+        address = offset
+        while address < data_size:
+            if record is None or not reusable:
+                template.offset = address
+                record = BindingContext(TemplateProvider(template),
+                                        data_provider,
+                                        propagate=False).template
+            else:
+                record._move(address)
+            end = record.absolute_address + record.size + record.padding_after
+            if end <= address:
+                raise RuntimeError(
+                    f"Unable to iterate records of '{record.name}' having no "
+                    "size."
+                )
+            if end > data_size:
+                raise RuntimeError(
+                    f"Unable to bind '{record.name}' at {address}, the data "
+                    "ends within the record."
+                )
+            yield record
+            address = end
+
     def add_extension(self, name, extension):
         """Adds a Binalyzer extension.
 
@@ -9,7 +9,14 @@
     :copyright: 2021 Denis Vasilík
     :license: MIT
 """
+from collections import OrderedDict
+from collections.abc import Sequence
+
 from .factory import TemplateFactory
+from .template_engine import (
+    FixedStrideArray,
+    _template_engine,
+)
 from .properties import ValueProperty
 from .template_provider import (
     TemplateProviderBase,
@@ -20,6 +27,7 @@ from .data_provider import (
     ZeroedDataProvider,
     PinnedBufferedIODataProvider,
 )
+from .aio import ThreadPoolDataProvider
 from .utils import (
     leftsiblings,
     rightsiblings,
@@ -27,55 +35,106 @@ from .utils import (
 
 
 class BindingEngine(object):
+    """The :class:`BindingEngine` transforms a template into a DOM by expanding,
+    reducing and validating its templates.
+
+    :param virtual_array_threshold: count from which templates having a fixed
+                                    layout are expanded into a
+                                    :class:`VirtualArray` instead of being
+                                    cloned, disabled if :const:`None`
+    :param virtual_array_cache_size: number of recently used elements kept
+                                     by each :class:`VirtualArray`
+    """
+
+    def __init__(self, virtual_array_threshold=None, virtual_array_cache_size=128):
+        #: Count from which templates are expanded into virtual arrays.
+        self.virtual_array_threshold = virtual_array_threshold
+
+        #: Number of elements cached by each virtual array.
+        self.virtual_array_cache_size = virtual_array_cache_size
 
-    def __init__(self):
         self._template_factory = TemplateFactory()
+        self._arrays = []
         self._template_visitor = {
-            lambda t: t.count > 1: self._expand,
-            lambda t: t.count == 0: self._reduce,
-            lambda t: t.signature: self._validate,
+            self._is_expandable: self._expand,
+            self._is_reducible: self._reduce,
+            self._has_signature: self._validate,
+        }
+
+    def __getstate__(self):
+        return {
+            'virtual_array_threshold': self.virtual_array_threshold,
+            'virtual_array_cache_size': self.virtual_array_cache_size,
         }
 
+    def __setstate__(self, state):
+        self.__init__(**state)
+
     def bind(self, template, binding_context):
         template = self._template_factory.clone(template)
         template.binding_context = binding_context
-        return self._process(template, binding_context)
+        return self._bind(template, binding_context)
+
+    def _bind(self, template, binding_context):
+        arrays = self._arrays
+        self._arrays = []
+        template = self._process(template, binding_context)
+        # Arrays are marked after all transformations have been applied,
+        # because expanding nested templates modifies their elements.
+        for elements in self._arrays:
+            FixedStrideArray(elements)
+        self._arrays = arrays
+        return template
+
+    def _bind_element(self, prototype, index, binding_context, address):
+        element = self._template_factory.clone(prototype, id=index)
+        element.binding_context = binding_context
+        element.offset = address
+        return self._bind(element, binding_context)
 
     def _process(self, template, binding_context):
-        processing = True
-        while processing:
-            processing = self._find_next_and_apply(
-                template,
-                self._template_visitor
-            )
+        # Templates are processed in pre-order using a worklist. Applying a
+        # visitor yields the templates that take the place of the visited one,
+        # which are processed next. Each template is thus visited once.
+        worklist = [template]
+        while worklist:
+            current = worklist.pop()
+            worklist.extend(reversed(self._apply(current,
+                                                 self._template_visitor)))
         return template
 
-    def _find_next_and_apply(self, template, visitors):
+    def _is_expandable(self, template):
+        return template.count > 1
+
+    def _is_reducible(self, template):
+        return template.count == 0
+
+    def _has_signature(self, template):
+        return template.signature
+
+    def _apply(self, template, visitors):
         for predicate, fn in visitors.items():
             if predicate(template):
-                fn(template)
-                return True
-        for child in template.children:
-            found = self._find_next_and_apply(child, visitors)
-            if found:
-                return True
-        return False
+                return fn(template)
+        return template.children
 
     def _validate(self, template):
-        size = len(template.signature)
-        template.binding_context.data_provider.data.seek(
-            template.absolute_address)
-        value = template.binding_context.data_provider.data.read(size)
+        value = template.binding_context.data_provider.read_at(
+            template.absolute_address, len(template.signature))
         if template.hint is None and template.signature != value:
             raise RuntimeError(
                 f"Signature validation failed for '{template.name}'."
             )
         elif template.hint and template.signature != value:
-            template.parent = None
+            if template.parent:
+                template.parent = None
+                return []
         template.signature = None
+        return [template]
 
     def _reduce(self, template):
         template.parent = None
+        return []
 
     def _expand(self, expandable):
         count = expandable.count
@@ -86,6 +145,12 @@ class BindingEngine(object):
         expandable.parent = None
         expandable.count_property = ValueProperty(1)
 
+        fixed_layout = _template_engine.has_fixed_layout(expandable)
+        if (fixed_layout and self.virtual_array_threshold is not None and
+                count >= self.virtual_array_threshold):
+            return [self._expand_virtually(expandable, count, parent, left,
+                                           right)]
+
         duplicates = []
         for i in range(count):
             duplicates.append(self._template_factory.clone(expandable, id=i))
@@ -96,12 +161,118 @@ class BindingEngine(object):
         parent_children.extend(right)
 
         parent.children = parent_children
+        if fixed_layout:
+            self._arrays.append(duplicates)
         template_name = expandable.name.replace("-", "_")
         parent.__dict__[template_name] = duplicates
 
         for i in range(count):
             del parent.__dict__[template_name + "_" + str(i)]
 
+        return duplicates
+
+    def _expand_virtually(self, expandable, count, parent, left, right):
+        # The placeholder covers the data of all elements, so that the layout
+        # of its parent and siblings is not affected.
+        placeholder = self._template_factory.clone(expandable)
+        placeholder.children = []
+        placeholder.signature = None
+
+        parent_children = []
+        parent_children.extend(left)
+        parent_children.append(placeholder)
+        parent_children.extend(right)
+
+        parent.children = parent_children
+
+        first = self._bind_element(
+            expandable, 0, parent.binding_context, placeholder.absolute_address
+        )
+        stride = first.padding_before + first.size + first.padding_after
+        placeholder.size = (count * stride -
+                            placeholder.padding_before -
+                            placeholder.padding_after)
+
+        elements = VirtualArray(
+            self, expandable, placeholder, count, stride,
+            self.virtual_array_cache_size
+        )
+        elements._add_element(0, first)
+
+        template_name = expandable.name.replace("-", "_")
+        parent.__dict__[template_name] = elements
+
+        return placeholder
+
+
+class VirtualArray(Sequence):
+    """A sequence of the elements of an expanded template that creates the
+    elements on access instead of cloning all of them during binding. Thus,
+    the cost of binding does not depend on the number of elements.
+
+    The elements are bound separately and are not part of the DOM. Within the
+    DOM, the array is represented by a single template covering the data of
+    all elements. At most `cache_size` recently used elements are kept.
+    """
+
+    def __init__(self, binding_engine, prototype, placeholder, count, stride,
+                 cache_size=128):
+        self._binding_engine = binding_engine
+        self._elements = OrderedDict()
+
+        #: The template the elements are created from.
+        self.prototype = prototype
+
+        #: The template covering the data of all elements within the DOM.
+        self.placeholder = placeholder
+
+        #: The distance between the addresses of two consecutive elements.
+        self.stride = stride
+
+        #: The maximum number of elements kept.
+        self.cache_size = cache_size
+
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError('Virtual array index out of range.')
+        return self._get_element(index)
+
+    def get_address(self, index):
+        """Returns the absolute address of the element at the given index.
+        """
+        return self.placeholder.absolute_address + index * self.stride
+
+    def _get_element(self, index):
+        address = self.get_address(index)
+        element = self._elements.get(index)
+        if element is not None and element.absolute_address == address:
+            self._elements.move_to_end(index)
+            return element
+
+        element = self._binding_engine._bind_element(
+            self.prototype,
+            index,
+            self.placeholder.binding_context,
+            address
+        )
+        self._add_element(index, element)
+        return element
+
+    def _add_element(self, index, element):
+        if self.cache_size:
+            self._elements[index] = element
+            while len(self._elements) > self.cache_size:
+                self._elements.popitem(last=False)
+
 
 class BindingContext(object):
     """The :class:`BindingContext` stores information about the binding between a
@@ -112,6 +283,10 @@ class BindingContext(object):
     The :class:`~binalyzer.BackedBindingContext` for instance uses a
     :class:`~binalyzer.ZeroedDataProvider` to bind a given template to zeroed data.
 
+    Binding contexts are pickled along with their bound DOM and data
+    provider, which thus needs to be picklable as well. Data providers of
+    files or memory maps are not.
+
     :param template_provider: a :class:`~binalyzer.TemplateProvider`
     :param data_provider: a :class:`~binalyzer.DataProvider`
     """
@@ -125,7 +300,11 @@ class BindingContext(object):
         #: The data provider to get the binary stream from.
         self.data_provider = data_provider
 
-        self._binding_engine = BindingEngine()
+        # Every template owns a binding context, thus the binding engine is
+        # only created once a DOM is requested.
+        self._binding_engine = None
+
+        self._async_data_provider = None
 
         #: The template provider to get the template from.
         self.template_provider = template_provider
@@ -162,6 +341,49 @@ class BindingContext(object):
     def data(self, value):
         self.data_provider.data = value
 
+    @property
+    def async_data_provider(self):
+        """The :class:`~binalyzer.aio.AsyncDataProviderBase` used to access
+        the data from :mod:`asyncio`. Defaults to a
+        :class:`~binalyzer.aio.ThreadPoolDataProvider` adapting the
+        :attr:`data_provider`.
+        """
+        async_data_provider = self._async_data_provider
+        if (async_data_provider is None or
+                (isinstance(async_data_provider, ThreadPoolDataProvider) and
+                 async_data_provider.data_provider is not self.data_provider)):
+            async_data_provider = ThreadPoolDataProvider(self.data_provider)
+            self._async_data_provider = async_data_provider
+        return async_data_provider
+
+    @async_data_provider.setter
+    def async_data_provider(self, value):
+        self._async_data_provider = value
+
+    @property
+    def binding_engine(self):
+        """The :class:`~binalyzer.BindingEngine` used to create the DOM.
+        """
+        if self._binding_engine is None:
+            self._binding_engine = BindingEngine()
+        return self._binding_engine
+
+    @binding_engine.setter
+    def binding_engine(self, value):
+        self._binding_engine = value
+        self.invalidate()
+
+    def __getstate__(self):
+        # The asynchronous data provider holds a lock and is recreated on
+        # demand.
+        state = self.__dict__.copy()
+        state['_async_data_provider'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.template_provider.template.binding_context = self
+
     def propagate(self, template):
         if template.children:
             for child in template.children:
@@ -173,10 +395,11 @@ class BindingContext(object):
     def _create_dom(self):
         if self._cached_dom:
             return self._cached_dom
-        self._cached_dom = self._binding_engine.bind(
+        self._cached_dom = self.binding_engine.bind(
             self.template_provider.template,
             self
         )
+        _template_engine.layout(self._cached_dom)
         return self._cached_dom
 
 
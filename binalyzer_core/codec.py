@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.codec
+    ~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the decoding of template values.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import struct
+
+from functools import lru_cache
+
+from .template_engine import _template_engine
+
+
+STRUCT_FORMATS = {
+    1: 'B',
+    2: 'H',
+    4: 'I',
+    8: 'Q',
+}
+
+BYTEORDER_PREFIXES = {
+    'little': '<',
+    'big': '>',
+}
+
+
+@lru_cache(maxsize=256)
+def get_struct(fmt):
+    """Returns a precompiled :class:`struct.Struct` of the given format.
+    """
+    return struct.Struct(fmt)
+
+
+def unpack(template, byteorder='little'):
+    """Decodes the leaves of the given template and returns their values as a
+    tuple in document order. Leaves of 1, 2, 4 or 8 bytes are decoded to
+    unsigned integers, all other leaves to :class:`bytes`.
+
+    The data of the template is read at once. Leaves that follow one another
+    in ascending order are decoded by a single precompiled
+    :class:`struct.Struct`, which skips the gaps between them.
+    """
+    addresses = _template_engine.layout(template)
+    base = addresses[template]
+    data = template.value
+
+    leaves = list(template.leaves)
+    values = [None] * len(leaves)
+    runs = []
+    position = None
+    for (index, leaf) in enumerate(leaves):
+        offset = addresses[leaf] - base
+        size = leaf.size
+        if size not in STRUCT_FORMATS:
+            values[index] = data[offset:offset + size]
+            continue
+        if position is None or offset < position:
+            runs.append([offset, BYTEORDER_PREFIXES[byteorder], []])
+            position = offset
+        run = runs[-1]
+        if offset > position:
+            run[1] += '{}x'.format(offset - position)
+        run[1] += STRUCT_FORMATS[size]
+        run[2].append(index)
+        position = offset + size
+
+    for (offset, fmt, indices) in runs:
+        decoded = get_struct(fmt).unpack_from(data, offset)
+        for (index, value) in zip(indices, decoded):
+            values[index] = value
+
+    return tuple(values)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.columns
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the columnar extraction of fields from arrays.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import sys
+import array
+
+from .codec import (
+    STRUCT_FORMATS,
+    BYTEORDER_PREFIXES,
+)
+from .template_engine import _template_engine
+
+
+def extract_column(elements, path, kind='array', byteorder='little'):
+    """Extracts the field at the given path of every array element.
+
+    The elements are either a :class:`~binalyzer.VirtualArray` or the list of
+    an expanded template. The path names the field relative to an element,
+    e.g. ``'header.length'``. The addresses of the fields are computed in bulk
+    and the data spanning all of them is read at once.
+
+    :param kind: ``'array'`` returns an :class:`array.array` of unsigned
+                 integers, ``'bytes'`` a list of :class:`bytes` and
+                 ``'numpy'`` a NumPy array
+    :param byteorder: the byte order used to decode integers
+    """
+    if kind not in ('array', 'bytes', 'numpy'):
+        raise RuntimeError(f"Unable to extract a column of kind '{kind}'.")
+    names = path.split('.')
+    if len(elements) == 0:
+        return _create_column(range(0), b'', 1, kind, byteorder)
+
+    first = elements[0]
+    field = _get_field(first, names)
+    size = field.size
+    if _is_uniform(elements):
+        # All elements share one layout, so the addresses of the fields
+        # follow from the stride of the array.
+        (address, stride) = _template_engine.get_array_layout(elements)
+        start = address + field.absolute_address - first.absolute_address
+        offsets = range(0, len(elements) * stride, stride)
+        length = offsets[-1] + size
+    else:
+        fields = [_get_field(element, names) for element in elements]
+        if any(field.size != size for field in fields):
+            raise RuntimeError(
+                f"Unable to extract column '{path}' of varying size."
+            )
+        addresses = [field.absolute_address for field in fields]
+        start = min(addresses)
+        offsets = [address - start for address in addresses]
+        length = max(offsets) + size
+
+    data_provider = first.binding_context.data_provider
+    span = data_provider.read_at(start, length)
+    if len(span) < length:
+        raise RuntimeError(f"Unable to extract column '{path}' beyond the data.")
+    return _create_column(offsets, span, size, kind, byteorder)
+
+
+def _is_uniform(elements):
+    if hasattr(elements, 'get_address'):
+        return True
+    fixed_stride_array = elements[0]._array
+    return fixed_stride_array is not None and all(
+        element._array is fixed_stride_array and element._array_index == index
+        for (index, element) in enumerate(elements)
+    )
+
+
+def _get_field(template, names):
+    for name in names:
+        for child in template.children:
+            if child.name == name:
+                template = child
+                break
+        else:
+            raise RuntimeError(
+                f"Unable to find field '{name}' in '{template.name}'."
+            )
+    return template
+
+
+def _create_column(offsets, span, size, kind, byteorder):
+    if kind == 'bytes':
+        return [span[offset:offset + size] for offset in offsets]
+    data = _gather(offsets, span, size)
+    if kind == 'numpy':
+        from .ndarray import _import_numpy
+        np = _import_numpy()
+        if size in STRUCT_FORMATS:
+            dtype = BYTEORDER_PREFIXES[byteorder] + 'u' + str(size)
+        else:
+            dtype = 'V' + str(size)
+        return np.frombuffer(data, dtype=dtype).copy()
+    column = array.array(_get_typecode(size))
+    column.frombytes(data)
+    if byteorder != sys.byteorder and size > 1:
+        column.byteswap()
+    return column
+
+
+def _gather(offsets, span, size):
+    # Densely packed fields are taken as they are, all others are copied
+    # field by field.
+    if isinstance(offsets, range) and (len(offsets) < 2 or
+                                       offsets.step == size):
+        return bytes(span[:len(offsets) * size])
+    with memoryview(span) as view:
+        return b''.join(view[offset:offset + size] for offset in offsets)
+
+
+def _get_typecode(size):
+    for typecode in 'BHILQ':
+        if array.array(typecode).itemsize == size:
+            return typecode
+    raise RuntimeError(
+        f'Unable to extract a column of {size} byte integers as array.'
+    )
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.compiler
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements a compiler that generates parsers from templates.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import struct
+
+from anytree import PreOrderIter
+
+from .template_engine import _template_engine
+from .codec import (
+    STRUCT_FORMATS,
+    BYTEORDER_PREFIXES,
+)
+from .properties import (
+    ValueProperty,
+    ReferenceProperty,
+    StretchSizeProperty,
+)
+
+
+class CompiledParser(object):
+    """A parser generated by the :class:`TemplateCompiler`.
+
+    Calling :meth:`parse` decodes a buffer into nested dictionaries keyed by
+    the names of the templates. Leaves of 1, 2, 4 or 8 bytes are decoded to
+    unsigned integers, all other leaves to :class:`bytes`.
+
+    :param source: the generated Python source of the parser
+    :param size: the size of the data the parser decodes
+    :param address: the absolute address of the data the parser decodes
+    """
+
+    def __init__(self, source, size, address=0):
+        #: The generated Python source of the parser.
+        self.source = source
+
+        #: The size of the data the parser decodes.
+        self.size = size
+
+        #: The absolute address of the data the parser decodes.
+        self.address = address
+
+        namespace = {'struct': struct}
+        exec(compile(source, '<binalyzer-parser>', 'exec'), namespace)
+        self._parse = namespace['parse']
+
+    def parse(self, data, base=None):
+        """Decodes the data found at the given base address of a buffer.
+
+        :param data: an object supporting the buffer protocol, e.g.
+                     :class:`bytes`, :class:`bytearray` or :class:`memoryview`
+        :param base: the address of the data within the buffer, the
+                     :attr:`address` of the data if :const:`None`
+        """
+        if base is None:
+            base = self.address
+        if len(data) < base + self.size:
+            raise RuntimeError(
+                'Unable to parse buffer, it is smaller than the template.'
+            )
+        return self._parse(data, base)
+
+    def __reduce__(self):
+        return (CompiledParser, (self.source, self.size, self.address))
+
+
+class TemplateCompiler(object):
+    """The :class:`TemplateCompiler` turns a template into a
+    :class:`CompiledParser`. The layout of the template is resolved once and
+    folded into constants of the generated code. One function is generated
+    per template shape, so the elements of an array share a function.
+
+    Only bound DOMs whose layout does not depend on data can be compiled,
+    see :attr:`~binalyzer.Binalyzer.template`. Templates that are yet to be
+    expanded, reduced or validated against a signature are rejected. Parsers
+    are cached by shape, size and address, and reused for templates of the
+    same shape, size and address.
+
+    :param byteorder: the byte order used to decode integers
+    """
+
+    def __init__(self, byteorder='little'):
+        #: The byte order used to decode integers.
+        self.byteorder = byteorder
+
+        self._parsers = {}
+
+    def compile(self, template):
+        """Returns a :class:`CompiledParser` decoding data laid out as given
+        by the template, which is a bound DOM. Raises a :class:`RuntimeError`
+        if the layout of the template depends on data, or if the template has
+        not been bound.
+        """
+        templates = list(PreOrderIter(template))
+        for current in templates:
+            if not self._is_bound(current):
+                raise RuntimeError(
+                    f"Unable to compile '{current.name}', it has not been "
+                    "bound."
+                )
+            if not self._is_static(current):
+                raise RuntimeError(
+                    f"Unable to compile '{current.name}', its layout depends "
+                    "on data."
+                )
+
+        addresses = _template_engine.layout(template)
+        shapes = {}
+        for current in reversed(templates):
+            shapes[current] = self._get_shape(current, addresses, shapes)
+
+        shape = shapes[template]
+        address = addresses[template]
+        key = (shape, template.size, address)
+        parser = self._parsers.get(key)
+        if parser is None:
+            parser = CompiledParser(self._generate(shape), template.size,
+                                    address)
+            self._parsers[key] = parser
+        return parser
+
+    def _is_bound(self, template):
+        # Counts and signatures are resolved by binding the template.
+        return (isinstance(template.count_property, ValueProperty) and
+                template.count == 1 and
+                template.signature is None)
+
+    def _is_static(self, template):
+        for value_property in (template.offset_property,
+                               template.size_property,
+                               template.padding_before_property,
+                               template.padding_after_property,
+                               template.boundary_property):
+            if isinstance(value_property, (ReferenceProperty,
+                                           StretchSizeProperty)):
+                return False
+        return True
+
+    def _get_shape(self, template, addresses, shapes):
+        if template.is_leaf:
+            return template.size
+        address = addresses[template]
+        return tuple(
+            (self._get_key(child, index),
+             addresses[child] - address,
+             shapes[child])
+            for (index, child) in enumerate(template.children)
+        )
+
+    def _get_key(self, template, index):
+        if template.name is None:
+            return index
+        return template.name
+
+    def _generate(self, shape):
+        generator = _SourceGenerator(BYTEORDER_PREFIXES[self.byteorder])
+        return generator.generate(shape)
+
+
+class _SourceGenerator(object):
+
+    def __init__(self, prefix):
+        self._prefix = prefix
+        self._structs = {}
+        self._functions = {}
+        self._lines = []
+
+    def generate(self, shape):
+        if isinstance(shape, int):
+            expression = self._get_leaf_expression(shape, 0)
+            self._lines.extend([
+                'def parse(buffer, base):',
+                f'    return {expression}',
+                '',
+            ])
+        else:
+            function = self._get_function(shape)
+            self._lines.extend([
+                f'parse = {function}',
+                '',
+            ])
+        header = [
+            f'{name} = struct.Struct({fmt!r}).unpack_from'
+            for (fmt, name) in self._structs.items()
+        ]
+        return '\n'.join(header + [''] + self._lines)
+
+    def _get_function(self, shape):
+        if shape in self._functions:
+            return self._functions[shape]
+
+        # Leaves in ascending order are decoded by a single struct skipping
+        # the gaps between them. Other leaves are decoded on their own.
+        fields = []
+        struct_fields = []
+        position = None
+        for (key, offset, child_shape) in shape:
+            if not isinstance(child_shape, int):
+                function = self._get_function(child_shape)
+                fields.append((key, f'{function}(buffer, base + {offset})'))
+                continue
+            size = child_shape
+            if size in STRUCT_FORMATS and (position is None or
+                                           offset >= position):
+                struct_fields.append((offset, size, len(fields)))
+                fields.append((key, f'v{len(fields)}'))
+                position = offset + size
+            else:
+                fields.append((key, self._get_leaf_expression(size, offset)))
+
+        name = f'_parse_{len(self._functions)}'
+        self._functions[shape] = name
+
+        lines = [f'def {name}(buffer, base):']
+        if struct_fields:
+            (fmt, start) = self._get_struct_format(struct_fields)
+            unpack = self._get_struct(fmt)
+            values = ', '.join(f'v{index}' for (_, _, index) in struct_fields)
+            lines.append(f'    ({values},) = {unpack}(buffer, base + {start})')
+        items = ', '.join(f'{key!r}: {expression}'
+                          for (key, expression) in fields)
+        lines.append(f'    return {{{items}}}')
+        lines.append('')
+        self._lines.extend(lines)
+        return name
+
+    def _get_struct_format(self, struct_fields):
+        start = struct_fields[0][0]
+        position = start
+        fmt = self._prefix
+        for (offset, size, _) in struct_fields:
+            if offset > position:
+                fmt += f'{offset - position}x'
+            fmt += STRUCT_FORMATS[size]
+            position = offset + size
+        return (fmt, start)
+
+    def _get_struct(self, fmt):
+        if fmt not in self._structs:
+            self._structs[fmt] = f'_unpack_{len(self._structs)}'
+        return self._structs[fmt]
+
+    def _get_leaf_expression(self, size, offset):
+        if size in STRUCT_FORMATS:
+            unpack = self._get_struct(self._prefix + STRUCT_FORMATS[size])
+            return f'{unpack}(buffer, base + {offset})[0]'
+        return f'bytes(buffer[base + {offset}:base + {offset + size}])'
+
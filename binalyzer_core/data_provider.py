@@ -8,10 +8,20 @@
     :copyright: 2021 Denis Vasilík
     :license: MIT
 """
-import io
+import os
+import mmap
+
+from collections import OrderedDict
+
+from .ranges import RangeBuffer
+from .sparse import SparseBuffer
 
 
 class DataProviderBase(object):
+    #: :const:`True` if the data provider can be used by multiple threads at
+    #: once; otherwise :const:`False`.
+    thread_safe = False
+
     @property
     def data(self):
         pass
@@ -20,16 +30,71 @@ class DataProviderBase(object):
     def data(self, value):
         pass
 
+    @property
+    def size(self):
+        """The size of the data in bytes."""
+        size = self.data.seek(0, 2)
+        self.data.seek(0)
+        return size
+
+    def ensure_size(self, size):
+        """Extends the data with zeros to at least the given size."""
+        data_size = self.size
+        if data_size < size:
+            self.data.seek(0, 2)
+            self.data.write(bytes(size - data_size))
+            self.data.seek(0)
+
+    def flush(self):
+        pass
+
     def read(self, template):
         pass
 
+    def read_at(self, address, size):
+        """Reads `size` bytes at the given address of the data."""
+        self.data.seek(address)
+        return self.data.read(size)
+
+    def read_view(self, template):
+        return memoryview(self.read(template))
+
+    def read_many(self, templates, gap=64):
+        """Reads the data of the given templates using as few reads as
+        possible. Ranges that overlap or are at most `gap` bytes apart are
+        merged into a single read. Returns a list of the values in the order
+        of the templates.
+        """
+        ranges = sorted(
+            (template.absolute_address, template.size, index)
+            for (index, template) in enumerate(templates)
+        )
+        values = [None] * len(ranges)
+        position = 0
+        while position < len(ranges):
+            start = ranges[position][0]
+            end = start + ranges[position][1]
+            last = position + 1
+            while last < len(ranges) and ranges[last][0] <= end + gap:
+                end = max(end, ranges[last][0] + ranges[last][1])
+                last += 1
+            data = self.read_at(start, end - start)
+            for (address, size, index) in ranges[position:last]:
+                values[index] = data[address - start:address - start + size]
+            position = last
+        return values
+
     def write(self, template, value):
         pass
 
+    def write_at(self, address, value):
+        pass
+
 
 class DataProvider(DataProviderBase):
     def __init__(self, data):
-        self._data = data
+        self._padded_size = 0
+        self.data = data
 
     @property
     def data(self):
@@ -38,27 +103,532 @@ class DataProvider(DataProviderBase):
     @data.setter
     def data(self, value):
         self._data = value
+        self._padded_size = 0
+
+    @property
+    def size(self):
+        """The size of the data in bytes, including the zeros it is extended
+        by.
+        """
+        return max(self._get_data_size(), self._padded_size)
+
+    def ensure_size(self, size):
+        """Extends the data with zeros to at least the given size. The zeros
+        are read as if they were part of the data, but written on
+        :meth:`flush` or a write beyond the end of the data only.
+        """
+        self._padded_size = max(self._padded_size, size)
+
+    def flush(self):
+        """Writes the zeros the data is extended by."""
+        if not self._padded_size:
+            return
+        data_size = self._get_data_size()
+        if data_size < self._padded_size:
+            self.data.seek(0, 2)
+            self.data.write(bytes(self._padded_size - data_size))
+            self.data.seek(0)
 
     def read(self, template):
-        absolute_address = template.absolute_address
-        size = template.size
-        self.data.seek(absolute_address)
+        return self.read_at(template.absolute_address, template.size)
+
+    def read_at(self, address, size):
+        self.data.seek(address)
         value = self.data.read(size)
         self.data.seek(0)
+        end = min(address + size, self._padded_size)
+        if address + len(value) < end:
+            value += bytes(end - address - len(value))
         return value
 
+    def read_view(self, template):
+        """Returns a :class:`memoryview` of the data the template is bound to.
+        The view refers to the buffer of :class:`~io.BytesIO`,
+        :class:`bytearray` or :class:`mmap.mmap` data without copying it. The
+        data of other streams is copied.
+
+        .. note:: A :class:`~io.BytesIO` cannot be resized while views of its
+                  buffer exist.
+        """
+        return self._read_view_at(template.absolute_address, template.size)
+
+    def _read_view_at(self, address, size):
+        buffer = get_buffer(self.data)
+        if buffer is None:
+            return memoryview(self.read_at(address, size))
+        if address + size > buffer.nbytes and self.size > buffer.nbytes:
+            # The view refers to zeros the data is extended by, which need
+            # to be written first.
+            buffer.release()
+            self.flush()
+            buffer = get_buffer(self.data)
+            if address + size > buffer.nbytes:
+                # The zeros are not written to read-only data.
+                buffer.release()
+                return memoryview(self.read_at(address, size))
+        return buffer[address:address + size]
+
+    def _get_data_size(self):
+        buffer = get_buffer(self.data)
+        if buffer is not None:
+            with buffer:
+                return buffer.nbytes
+        size = self.data.seek(0, 2)
+        self.data.seek(0)
+        return size
+
     def write(self, template, value):
-        self.data.seek(template.absolute_address)
+        self.write_at(template.absolute_address, value)
+
+    def write_at(self, address, value):
+        self.data.seek(address)
         self.data.write(value)
         self.data.seek(0)
 
 
+class MmapDataProvider(DataProvider):
+    """A data provider that maps a file into memory using :mod:`mmap`. Only
+    the pages of the file that are accessed are read, which makes it suitable
+    for images too large to be held in memory.
+
+    :param file: a path or a binary file object of the file to map
+    :param writable: maps the file read-write if :const:`True`; otherwise
+                     read-only
+    """
+
+    thread_safe = True
+
+    def __init__(self, file, writable=False):
+        self._writable = writable
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            self._file = open(file, 'r+b' if writable else 'rb')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        try:
+            data = mmap.mmap(self._file.fileno(), 0, access=access)
+        except ValueError as error:
+            self._close_file()
+            raise RuntimeError('Unable to map an empty file.') from error
+        super(MmapDataProvider, self).__init__(data)
+
+    @property
+    def writable(self):
+        """:const:`True` if the file is mapped read-write; otherwise
+        :const:`False`.
+        """
+        return self._writable
+
+    def flush(self):
+        """Extends a file mapped read-write with the zeros the data is
+        extended by, see :meth:`~binalyzer.DataProvider.ensure_size`. The
+        zeros of a file mapped read-only are only read.
+        """
+        if self._writable and len(self.data) < self._padded_size:
+            self.data.resize(self._padded_size)
+
+    def read_at(self, address, size):
+        value = self.data[address:address + size]
+        end = min(address + size, self._padded_size)
+        if address + len(value) < end:
+            value += bytes(end - address - len(value))
+        return value
+
+    def write_at(self, address, value):
+        if not self._writable:
+            raise RuntimeError('Unable to write to a read-only mapped file.')
+        self.ensure_size(address + len(value))
+        self.flush()
+        self.data[address:address + len(value)] = value
+
+    def _get_data_size(self):
+        return len(self.data)
+
+    def close(self):
+        """Unmaps the file and closes it, if it has been opened by the data
+        provider.
+        """
+        self.data.close()
+        self._close_file()
+
+    def _close_file(self):
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PositionalDataProvider(DataProvider):
+    """A data provider that reads and writes at absolute positions without
+    moving a shared stream position, which allows multiple threads to read
+    the data at once.
+
+    Files are accessed using :func:`os.pread` and :func:`os.pwrite` on their
+    file descriptor, which release the GIL. The buffers of :class:`bytes`,
+    :class:`bytearray`, :class:`mmap.mmap` and :class:`~io.BytesIO` data are
+    sliced.
+
+    .. note:: Data written to a buffered file object must be flushed before it
+              is read by the data provider.
+
+    :param data: a binary file object or an object providing a buffer
+    """
+
+    thread_safe = True
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._fileno = None
+        if get_buffer(value) is None:
+            self._fileno = value.fileno()
+            if not hasattr(os, 'pread'):
+                raise RuntimeError(
+                    'Unable to read files at positions on this platform.'
+                )
+
+    def flush(self):
+        """Writes the zeros the data is extended by, see
+        :meth:`~binalyzer.DataProvider.ensure_size`.
+        """
+        data_size = self._get_data_size()
+        if data_size >= self._padded_size:
+            return
+        if self._fileno is not None:
+            os.pwrite(self._fileno, bytes(self._padded_size - data_size),
+                      data_size)
+        elif isinstance(self.data, bytearray):
+            self.data.extend(bytes(self._padded_size - data_size))
+        elif isinstance(self.data, mmap.mmap):
+            self.data.resize(self._padded_size)
+        else:
+            super(PositionalDataProvider, self).flush()
+
+    def read_at(self, address, size):
+        if self._fileno is not None:
+            value = os.pread(self._fileno, size, address)
+        else:
+            with get_buffer(self.data) as buffer:
+                value = bytes(buffer[address:address + size])
+        end = min(address + size, self._padded_size)
+        if address + len(value) < end:
+            value += bytes(end - address - len(value))
+        return value
+
+    def write_at(self, address, value):
+        self.ensure_size(address + len(value))
+        if address + len(value) > self._get_data_size():
+            # The zeros the data is extended by need to be written before the
+            # data can be written beyond its end.
+            self.flush()
+        if self._fileno is not None:
+            os.pwrite(self._fileno, value, address)
+            return
+        with get_buffer(self.data) as buffer:
+            buffer[address:address + len(value)] = value
+
+    def _get_data_size(self):
+        if self._fileno is not None:
+            return os.fstat(self._fileno).st_size
+        with get_buffer(self.data) as buffer:
+            return buffer.nbytes
+
+
+class CachedDataProvider(DataProviderBase):
+    """A data provider that caches the data of another data provider in
+    aligned blocks. The least recently used blocks are evicted once the size
+    of the cache is exceeded. Writes are passed through and invalidate the
+    affected blocks.
+
+    :param data_provider: the data provider whose data is cached
+    :param block_size: the size of a block in bytes
+    :param cache_size: the maximum size of the cache in bytes
+    """
+
+    def __init__(self, data_provider, block_size=4096, cache_size=1 << 20):
+        if block_size <= 0:
+            raise RuntimeError('Unable to cache blocks of no size.')
+
+        #: The data provider whose data is cached.
+        self.data_provider = data_provider
+
+        #: The size of a block in bytes.
+        self.block_size = block_size
+
+        #: The maximum number of cached blocks.
+        self.capacity = max(1, cache_size // block_size)
+
+        #: The number of blocks read from the cache.
+        self.hits = 0
+
+        #: The number of blocks read from the :attr:`data_provider`.
+        self.misses = 0
+
+        self._blocks = OrderedDict()
+        self._partial_blocks = set()
+
+    @property
+    def data(self):
+        return self.data_provider.data
+
+    @data.setter
+    def data(self, value):
+        self.data_provider.data = value
+        self.clear()
+
+    @property
+    def size(self):
+        return self.data_provider.size
+
+    def ensure_size(self, size):
+        self.data_provider.ensure_size(size)
+        self._invalidate_partial_blocks()
+
+    def flush(self):
+        self.data_provider.flush()
+
+    def read(self, template):
+        return self.read_at(template.absolute_address, template.size)
+
+    def read_at(self, address, size):
+        if size <= 0:
+            return b''
+        first = address // self.block_size
+        last = (address + size - 1) // self.block_size
+        blocks = self._get_blocks(first, last)
+        start = address - first * self.block_size
+        if len(blocks) == 1:
+            return blocks[0][start:start + size]
+        return b''.join(blocks)[start:start + size]
+
+    def write(self, template, value):
+        self.write_at(template.absolute_address, value)
+
+    def write_at(self, address, value):
+        self.data_provider.write_at(address, value)
+        first = address // self.block_size
+        last = (address + max(len(value), 1) - 1) // self.block_size
+        for index in range(first, last + 1):
+            self._blocks.pop(index, None)
+        self._invalidate_partial_blocks()
+
+    def clear(self):
+        """Removes all blocks from the cache."""
+        self._blocks.clear()
+        self._partial_blocks.clear()
+
+    def _get_blocks(self, first, last):
+        blocks = []
+        missing = None
+        for index in range(first, last + 1):
+            block = self._blocks.get(index)
+            if block is None:
+                if missing is None:
+                    missing = index
+                continue
+            if missing is not None:
+                blocks.extend(self._load_blocks(missing, index - 1))
+                missing = None
+            self._blocks.move_to_end(index)
+            self.hits += 1
+            blocks.append(block)
+        if missing is not None:
+            blocks.extend(self._load_blocks(missing, last))
+        return blocks
+
+    def _load_blocks(self, first, last):
+        # Consecutive blocks that are missing are read at once.
+        block_size = self.block_size
+        data = self.data_provider.read_at(first * block_size,
+                                          (last - first + 1) * block_size)
+        blocks = []
+        for index in range(first, last + 1):
+            offset = (index - first) * block_size
+            block = data[offset:offset + block_size]
+            blocks.append(block)
+            self.misses += 1
+            self._blocks[index] = block
+            if len(block) < block_size:
+                self._partial_blocks.add(index)
+            if len(self._blocks) > self.capacity:
+                self._blocks.popitem(last=False)
+        return blocks
+
+    def _invalidate_partial_blocks(self):
+        # Blocks at the end of the data are shorter than the block size and
+        # become stale as soon as the data grows.
+        for index in self._partial_blocks:
+            self._blocks.pop(index, None)
+        self._partial_blocks.clear()
+
+
+class OverlayDataProvider(DataProviderBase):
+    """A data provider that keeps writes in memory as patches on top of
+    another data provider, which is never modified. Reads merge the data of
+    the other data provider with the patches. Thus, the memory required to
+    modify large read-only data is proportional to the modifications.
+
+    :param data_provider: the data provider of the base data, or data that
+                          is read using a
+                          :class:`~binalyzer.PositionalDataProvider`
+    """
+
+    def __init__(self, data_provider):
+        if not isinstance(data_provider, DataProviderBase):
+            data_provider = PositionalDataProvider(data_provider)
+
+        #: The data provider of the base data.
+        self.data_provider = data_provider
+
+        self._pending = RangeBuffer()
+        self._size = 0
+
+    @property
+    def data(self):
+        return self.data_provider.data
+
+    @data.setter
+    def data(self, value):
+        self.data_provider.data = value
+        self._pending.clear()
+        self._size = 0
+
+    @property
+    def size(self):
+        return max(self.data_provider.size, self._pending.end, self._size)
+
+    @property
+    def patches(self):
+        """A list of the patches as tuples of address and data in ascending
+        order of their address.
+        """
+        return list(self._pending)
+
+    def ensure_size(self, size):
+        self._size = max(self._size, size)
+
+    def read(self, template):
+        return self.read_at(template.absolute_address, template.size)
+
+    def read_at(self, address, size):
+        data = self.data_provider.read_at(address, size)
+        data = self._pending.overlay(address, data, size)
+        length = min(size, self.size - address)
+        if len(data) < length:
+            data += bytes(length - len(data))
+        return data
+
+    def write(self, template, value):
+        self.write_at(template.absolute_address, value)
+
+    def write_at(self, address, value):
+        self._pending.write(address, value)
+
+    def save_to(self, file, chunk_size=1 << 20):
+        """Writes the patched data to the given path or binary file object
+        in chunks of the given size.
+        """
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            with open(file, 'wb') as stream:
+                self.save_to(stream, chunk_size)
+            return
+        size = self.size
+        for address in range(0, size, chunk_size):
+            file.write(self.read_at(address, min(chunk_size, size - address)))
+
+
+class WriteBackDataProvider(OverlayDataProvider):
+    """A data provider that holds writes back and passes them to another data
+    provider on :meth:`flush`. Writes to overlapping and adjacent ranges are
+    merged and flushed in ascending order of their address. Reads take the
+    pending writes into account.
+
+    Used as a context manager, the pending writes are flushed on exit.
+
+    :param data_provider: the data provider the writes are passed to
+    :param buffer_size: the number of pending bytes at which the writes are
+                        flushed, or :const:`None` to flush explicitly only
+    """
+
+    def __init__(self, data_provider, buffer_size=None):
+        super(WriteBackDataProvider, self).__init__(data_provider)
+
+        #: The number of pending bytes at which the writes are flushed.
+        self.buffer_size = buffer_size
+
+    @property
+    def data(self):
+        return self.data_provider.data
+
+    @data.setter
+    def data(self, value):
+        self.flush()
+        self.data_provider.data = value
+
+    @property
+    def dirty(self):
+        """:const:`True` if there are writes pending; otherwise
+        :const:`False`.
+        """
+        return len(self._pending) > 0
+
+    def ensure_size(self, size):
+        self.data_provider.ensure_size(size)
+
+    def write_at(self, address, value):
+        self._pending.write(address, value)
+        if (self.buffer_size is not None and
+                self._pending.size >= self.buffer_size):
+            self.flush()
+
+    def flush(self):
+        """Passes the pending writes to the :attr:`data_provider`."""
+        for (address, value) in self._pending:
+            self.data_provider.write_at(address, value)
+        self._pending.clear()
+        self.data_provider.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
 class BufferedIODataProvider(DataProvider):
+    """A data provider of in-memory data filled with a constant value. The
+    data is held by a :class:`~binalyzer.sparse.SparseBuffer`, which only
+    allocates memory for the parts that are written.
+
+    :param size: the initial size of the data in bytes
+    :param value: the byte value the data is filled with
+    """
 
     def __init__(self, size=0, value=0):
         self._value = value
-        super(BufferedIODataProvider, self).__init__(
-            io.BytesIO(bytes([value] * size)))
+        super(BufferedIODataProvider, self).__init__(SparseBuffer(size, value))
+
+    def ensure_size(self, size):
+        """Extends the data with the fill value to at least the given size."""
+        data_size = self.size
+        if data_size >= size:
+            return
+        if isinstance(self.data, SparseBuffer):
+            self.data.truncate(size)
+        else:
+            self.data.seek(0, 2)
+            self.data.write(bytes((self._value,)) * (size - data_size))
+            self.data.seek(0)
 
 
 class ZeroedDataProvider(BufferedIODataProvider):
@@ -76,12 +646,28 @@ class PinnedBufferedIODataProvider(BufferedIODataProvider):
         self.data.seek(self._address)
         return self.data.read(template.size)
 
+    def read_view(self, template):
+        self.extend(template)
+        return self._read_view_at(self._address, template.size)
+
+    def read_many(self, templates, gap=64):
+        return [self.read(template) for template in templates]
+
     def write(self, template, value):
         self.data.seek(self._address)
         self.data.write(value)
 
     def extend(self, template):
-        data_size = self.data.seek(0, 2)
-        if template.size > data_size:
-            extension_size = template.size - data_size
-            self.data.write(bytes([self._value] * extension_size))
+        self.ensure_size(template.size)
+
+
+def get_buffer(data):
+    """Returns a :class:`memoryview` of the buffer backing the given data, or
+    :const:`None` if the data is a stream without an accessible buffer.
+    """
+    if hasattr(data, 'getbuffer'):
+        return data.getbuffer()
+    try:
+        return memoryview(data)
+    except TypeError:
+        return None
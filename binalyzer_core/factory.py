@@ -35,18 +35,36 @@ class PropertyFactory(object):
         ]
 
     def clone(self, prototype, template):
-        factory = [f for f in self.property_factories
-                   if f.is_clonable(prototype)][0]
+        factory = next(f for f in self.property_factories
+                       if f.is_clonable(prototype))
         duplicate = factory.clone(prototype, template)
         return duplicate
 
+    def spec(self, prototype):
+        """Returns a compact, picklable description of the given property,
+        from which :meth:`create` creates an equal property.
+        """
+        (index, factory) = next((i, f) for (i, f)
+                                in enumerate(self.property_factories)
+                                if f.is_clonable(prototype))
+        return (index, factory.spec(prototype))
+
+    def create(self, spec, template):
+        (index, args) = spec
+        return self.property_factories[index].create(template, *args)
+
 
 class PropertyBaseFactory(object):
 
     def clone(self, prototype, template):
+        return self.create(template, type(prototype.value_provider))
+
+    def spec(self, prototype):
+        return (type(prototype.value_provider),)
+
+    def create(self, template, value_provider_type):
         property_base = PropertyBase(template)
-        property_base.value_provider = type(
-            prototype.value_provider)(property_base)
+        property_base.value_provider = value_provider_type(property_base)
         return property_base
 
     def is_clonable(self, obj):
@@ -58,6 +76,12 @@ class ValuePropertyFactory(object):
     def clone(self, prototype, template):
         return ValueProperty(prototype.value, template)
 
+    def spec(self, prototype):
+        return (prototype.value,)
+
+    def create(self, template, value):
+        return ValueProperty(value, template)
+
     def is_clonable(self, obj):
         return isinstance(obj, ValueProperty)
 
@@ -65,12 +89,17 @@ class ValuePropertyFactory(object):
 class ReferencePropertyFactory(object):
 
     def clone(self, prototype, template):
+        return self.create(template, *self.spec(prototype))
+
+    def spec(self, prototype):
+        return (prototype.reference_name, type(prototype.value_provider))
+
+    def create(self, template, reference_name, value_provider_type):
         ref_property = ReferenceProperty(
             template,
-            prototype.reference_name
+            reference_name
         )
-        ref_property.value_provider = type(
-            prototype.value_provider)(ref_property)
+        ref_property.value_provider = value_provider_type(ref_property)
         return ref_property
 
     def is_clonable(self, obj):
@@ -85,6 +114,13 @@ class OffsetValuePropertyFactory(object):
             prototype.value,
         )
 
+    def spec(self, prototype):
+        # The assigned offset, which is not adjusted to the boundary yet.
+        return (prototype.value_provider._value,)
+
+    def create(self, template, value):
+        return OffsetValueProperty(template, value)
+
     def is_clonable(self, obj):
         return isinstance(obj, OffsetValueProperty)
 
@@ -97,6 +133,12 @@ class RelativeOffsetValuePropertyFactory(object):
             prototype.ignore_boundary,
         )
 
+    def spec(self, prototype):
+        return (prototype.ignore_boundary,)
+
+    def create(self, template, ignore_boundary):
+        return RelativeOffsetValueProperty(template, ignore_boundary)
+
     def is_clonable(self, obj):
         return isinstance(obj, RelativeOffsetValueProperty)
 
@@ -109,6 +151,12 @@ class RelativeOffsetReferencePropertyFactory(object):
             prototype.reference_name,
         )
 
+    def spec(self, prototype):
+        return (prototype.reference_name,)
+
+    def create(self, template, reference_name):
+        return RelativeOffsetReferenceProperty(template, reference_name)
+
     def is_clonable(self, obj):
         return isinstance(obj, RelativeOffsetReferenceProperty)
 
@@ -118,6 +166,12 @@ class StretchSizePropertyFactory(object):
     def clone(self, prototype, template):
         return StretchSizeProperty(template)
 
+    def spec(self, prototype):
+        return ()
+
+    def create(self, template):
+        return StretchSizeProperty(template)
+
     def is_clonable(self, obj):
         return isinstance(obj, StretchSizeProperty)
 
@@ -127,6 +181,12 @@ class AutoSizeValuePropertyFactory(object):
     def clone(self, prototype, template):
         return AutoSizeValueProperty(template)
 
+    def spec(self, prototype):
+        return ()
+
+    def create(self, template):
+        return AutoSizeValueProperty(template)
+
     def is_clonable(self, obj):
         return isinstance(obj, AutoSizeValueProperty)
 
@@ -146,36 +206,144 @@ class TemplateFactory(object):
 
         duplicate.parent = parent
 
-        duplicate.offset_property = self.property_factory.clone(
+        # The duplicate has not been resolved yet, thus there is nothing to
+        # invalidate and the properties are assigned directly.
+        duplicate._offset = self.property_factory.clone(
             prototype.offset_property,
             duplicate
         )
-        duplicate.size_property = self.property_factory.clone(
+        duplicate._size = self.property_factory.clone(
             prototype.size_property,
             duplicate
         )
-        duplicate.boundary_property = self.property_factory.clone(
+        duplicate._boundary = self.property_factory.clone(
             prototype.boundary_property,
             duplicate
         )
-        duplicate.padding_before_property = self.property_factory.clone(
+        duplicate._padding_before = self.property_factory.clone(
             prototype.padding_before_property,
             duplicate
         )
-        duplicate.padding_after_property = self.property_factory.clone(
+        duplicate._padding_after = self.property_factory.clone(
             prototype.padding_after_property,
             duplicate
         )
-        duplicate.count_property = self.property_factory.clone(
+        duplicate._count = self.property_factory.clone(
             prototype.count_property,
             duplicate
         )
 
-        duplicate.signature = prototype.signature
-        duplicate.hint = prototype.hint
-        duplicate.text = prototype.text
+        duplicate._signature = prototype.signature
+        duplicate._hint = prototype.hint
+        duplicate._text = prototype.text
+        if prototype.text and isinstance(duplicate.size_property,
+                                         AutoSizeValueProperty):
+            duplicate._size = ValueProperty(len(prototype.text))
 
         for child in prototype.children:
             self.clone(child, parent=duplicate)
 
         return duplicate
+
+    def spec(self, template):
+        """Returns a compact, picklable description of the given template
+        tree, from which :meth:`create` creates an equal template tree. Bound
+        data and cached values are not part of the description.
+        """
+        properties = tuple(
+            self.property_factory.spec(template_property)
+            for template_property in (template.offset_property,
+                                      template.size_property,
+                                      template.boundary_property,
+                                      template.padding_before_property,
+                                      template.padding_after_property,
+                                      template.count_property)
+        )
+        return (
+            type(template),
+            template.name,
+            properties,
+            template.signature,
+            template.hint,
+            template.text,
+            self._get_array_specs(template),
+            tuple(self.spec(child) for child in template.children),
+        )
+
+    def create(self, spec, parent=None):
+        """Creates a template tree from a description returned by
+        :meth:`spec`.
+        """
+        (template_type, name, properties, signature, hint, text, arrays,
+         children) = spec
+        template = template_type()
+        template.name = name
+        template.parent = parent
+
+        # The template has not been resolved yet, thus there is nothing to
+        # invalidate and the properties are assigned directly.
+        (template._offset,
+         template._size,
+         template._boundary,
+         template._padding_before,
+         template._padding_after,
+         template._count) = (self.property_factory.create(property_spec,
+                                                          template)
+                             for property_spec in properties)
+        template._signature = signature
+        template._hint = hint
+        template._text = text
+
+        for child in children:
+            self.create(child, parent=template)
+
+        self._create_arrays(template, arrays)
+        return template
+
+    def _get_array_specs(self, template):
+        # Expanded templates are accessible as lists of their elements or as
+        # virtual arrays through attributes of their parent.
+        from .binding import VirtualArray
+
+        specs = []
+        for (name, value) in template.__dict__.items():
+            if name.startswith('_'):
+                continue
+            if isinstance(value, list) and value:
+                specs.append((
+                    name,
+                    tuple(element.sibling_index for element in value),
+                ))
+            elif isinstance(value, VirtualArray):
+                specs.append((
+                    name,
+                    value.placeholder.sibling_index,
+                    self.spec(value.prototype),
+                    len(value),
+                    value.stride,
+                    value.cache_size,
+                ))
+        return tuple(specs)
+
+    def _create_arrays(self, template, specs):
+        from .binding import (
+            BindingEngine,
+            VirtualArray,
+        )
+
+        children = template.children
+        for spec in specs:
+            if len(spec) == 2:
+                (name, indices) = spec
+                template.__dict__[name] = [children[index]
+                                           for index in indices]
+            else:
+                (name, index, prototype, count, stride, cache_size) = spec
+                template.__dict__[name] = VirtualArray(
+                    BindingEngine(virtual_array_cache_size=cache_size),
+                    self.create(prototype),
+                    children[index],
+                    count,
+                    stride,
+                    cache_size,
+                )
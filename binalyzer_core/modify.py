@@ -35,7 +35,7 @@ def project(source_template, destination_template, additional_data={}):
         if destination_leave.size > source_leave.size:
             extension_size = destination_leave.size - source_leave.size
         destination_leave.value = (
-            source_leave.value + bytes([0] * extension_size))
+            source_leave.value + bytes(extension_size))
         if overriden_size:
             destination_leave.size = overriden_size
 
@@ -75,7 +75,7 @@ def _bind(templates, data_template_map):
         if template.name in list(data_template_map.keys()):
             template.value = data_template_map[template.name]
         else:
-            template.value = bytes([0] * template.size)
+            template.value = bytes(template.size)
 
 
 def _is_path_equal(source_path, dest_path):
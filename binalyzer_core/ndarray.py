@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.ndarray
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the export of templates to NumPy. NumPy is an
+    optional dependency, install it using the `numpy` extra.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+from .codec import (
+    STRUCT_FORMATS,
+    BYTEORDER_PREFIXES,
+)
+from .template_engine import _template_engine
+from .data_provider import get_buffer
+
+
+def to_dtype(template, byteorder='little'):
+    """Derives a structured NumPy dtype from the layout of the given template.
+
+    The offsets of the fields take boundaries and paddings into account. Leaves
+    of 1, 2, 4 or 8 bytes become unsigned integers, all other leaves raw void
+    fields. Templates with children become nested structured fields.
+    """
+    np = _import_numpy()
+    addresses = _template_engine.layout(template)
+    return _get_dtype(np, template, addresses, BYTEORDER_PREFIXES[byteorder])
+
+
+def as_array(elements, byteorder='little'):
+    """Returns a NumPy array viewing the data of the given array elements
+    without copying it.
+
+    The elements are either a :class:`~binalyzer.VirtualArray` or the list of
+    an expanded template, which requires the elements to be equally spaced.
+    The view is created on the buffer of :class:`~io.BytesIO`,
+    :class:`bytearray` or :class:`mmap.mmap` data, and on a memory map for
+    file data.
+
+    .. note:: A :class:`~io.BytesIO` cannot be resized while views of its
+              buffer exist.
+    """
+    np = _import_numpy()
+    count = len(elements)
+    if count == 0:
+        raise RuntimeError('Unable to create an array view of no elements.')
+    first = elements[0]
+    layout = _template_engine.get_array_layout(elements)
+    if layout is None:
+        raise RuntimeError(
+            'Unable to create an array view of unequally spaced elements.'
+        )
+    (address, stride) = layout
+    dtype = to_dtype(first, byteorder)
+    buffer = _get_buffer(np, first.binding_context.data_provider.data)
+    if address + (count - 1) * stride + dtype.itemsize > len(buffer):
+        raise RuntimeError('Unable to create an array view beyond the data.')
+    return np.ndarray(
+        shape=(count,),
+        dtype=dtype,
+        buffer=buffer,
+        offset=address,
+        strides=(stride,),
+    )
+
+
+def _get_dtype(np, template, addresses, prefix):
+    if template.is_leaf:
+        size = template.size
+        if size in STRUCT_FORMATS:
+            return np.dtype(prefix + 'u' + str(size))
+        return np.dtype('V' + str(size))
+    names = []
+    formats = []
+    offsets = []
+    base = addresses[template]
+    for (index, child) in enumerate(template.children):
+        names.append(child.name if child.name else 'f' + str(index))
+        formats.append(_get_dtype(np, child, addresses, prefix))
+        offsets.append(addresses[child] - base)
+    return np.dtype({
+        'names': names,
+        'formats': formats,
+        'offsets': offsets,
+        'itemsize': template.size,
+    })
+
+
+def _get_buffer(np, data):
+    buffer = get_buffer(data)
+    if buffer is not None:
+        return buffer
+    if hasattr(data, 'fileno') and hasattr(data, 'name'):
+        mode = 'r+' if data.writable() else 'r'
+        return np.memmap(data.name, dtype=np.uint8, mode=mode)
+    raise RuntimeError('Unable to access the buffer of the data.')
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError(
+            'NumPy is required, install binalyzer_core[numpy].'
+        ) from error
+    return numpy
@@ -87,7 +87,9 @@ class ReferenceProperty(PropertyBase):
         super(ReferenceProperty, self).__init__(None, value_provider)
 
     def get_template(self):
-        return self._find(self.origin, self.reference_name)
+        template = self._find(self.origin, self.reference_name)
+        template._add_dependent(self.origin)
+        return template
 
     def set_template(self, value):
         raise RuntimeError(
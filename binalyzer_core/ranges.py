@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.ranges
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements a buffer of byte ranges that is used by data
+    providers to hold modifications of data.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import bisect
+
+
+class RangeBuffer(object):
+    """A :class:`RangeBuffer` stores data written at arbitrary addresses as
+    disjoint ranges sorted by their address. Overlapping and adjacent writes
+    are merged into a single range, later writes taking precedence.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ranges = []
+
+    def __len__(self):
+        """The number of ranges."""
+        return len(self._ranges)
+
+    def __iter__(self):
+        """Iterates the ranges as tuples of address and data in ascending
+        order of their address.
+        """
+        return iter(zip(self._starts, (bytes(data) for data in self._ranges)))
+
+    @property
+    def size(self):
+        """The number of bytes held by the buffer."""
+        return sum(len(data) for data in self._ranges)
+
+    @property
+    def end(self):
+        """The address following the last range, or 0 if the buffer is
+        empty.
+        """
+        if not self._ranges:
+            return 0
+        return self._starts[-1] + len(self._ranges[-1])
+
+    def write(self, address, value):
+        """Writes the value at the given address."""
+        if not value:
+            return
+        end = address + len(value)
+        # Ranges from `first` up to but excluding `last` overlap or touch the
+        # written range and are merged with it.
+        first = bisect.bisect_left(self._starts, address)
+        if (first > 0 and
+                self._starts[first - 1] + len(self._ranges[first - 1]) >= address):
+            first -= 1
+        last = bisect.bisect_right(self._starts, end)
+        if first == last:
+            self._starts.insert(first, address)
+            self._ranges.insert(first, bytearray(value))
+            return
+        start = min(address, self._starts[first])
+        stop = max(end, self._starts[last - 1] + len(self._ranges[last - 1]))
+        data = bytearray(stop - start)
+        for index in range(first, last):
+            offset = self._starts[index] - start
+            data[offset:offset + len(self._ranges[index])] = self._ranges[index]
+        data[address - start:end - start] = value
+        self._starts[first:last] = [start]
+        self._ranges[first:last] = [data]
+
+    def overlay(self, address, data, size):
+        """Returns `size` bytes at the given address, taking the data read at
+        the address and replacing it by the ranges of the buffer. Ranges
+        beyond the data extend it, gaps are filled with zeros.
+        """
+        end = address + size
+        first = bisect.bisect_right(self._starts, address)
+        if (first > 0 and
+                self._starts[first - 1] + len(self._ranges[first - 1]) > address):
+            first -= 1
+        last = bisect.bisect_left(self._starts, end)
+        if first == last:
+            return data
+        length = len(data)
+        for index in range(first, last):
+            length = max(length, min(end, self._starts[index] +
+                                     len(self._ranges[index])) - address)
+        result = bytearray(data)
+        result.extend(bytes(length - len(result)))
+        for index in range(first, last):
+            start = self._starts[index]
+            value = self._ranges[index]
+            begin = max(start, address)
+            stop = min(start + len(value), end)
+            part = value[begin - start:stop - start]
+            result[begin - address:stop - address] = part
+        return bytes(result)
+
+    def clear(self):
+        """Removes all ranges."""
+        self._starts.clear()
+        self._ranges.clear()
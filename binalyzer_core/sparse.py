@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.sparse
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements a sparse in-memory binary stream.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import io
+
+
+class SparseBuffer(io.RawIOBase):
+    """A binary stream filled with a constant value that only allocates the
+    pages that are written. Creating a buffer of any size takes constant
+    time, data is materialized on :meth:`getvalue` only.
+
+    :param size: the initial size of the buffer in bytes
+    :param value: the byte value the buffer is filled with
+    :param page_size: the size of an allocated page in bytes
+    """
+
+    def __init__(self, size=0, value=0, page_size=4096):
+        super(SparseBuffer, self).__init__()
+        self._size = size
+        self._value = value
+        self._page_size = page_size
+        self._pages = {}
+        self._position = 0
+
+    @property
+    def value(self):
+        """The byte value the buffer is filled with."""
+        return self._value
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f'Invalid whence ({whence})')
+        if position < 0:
+            raise ValueError(f'Negative seek position {position}')
+        self._position = position
+        return position
+
+    def read(self, size=-1):
+        start = self._position
+        end = self._size if size is None or size < 0 else min(self._size,
+                                                              start + size)
+        if end <= start:
+            return b''
+        self._position = end
+        return self._read(start, end)
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def write(self, value):
+        start = self._position
+        end = start + len(value)
+        with memoryview(value) as view:
+            view = view.cast('B')
+            position = start
+            while position < end:
+                (index, offset) = divmod(position, self._page_size)
+                length = min(self._page_size - offset, end - position)
+                source = position - start
+                page = self._get_page(index)
+                page[offset:offset + length] = view[source:source + length]
+                position += length
+        self._position = end
+        self._size = max(self._size, end)
+        return len(value)
+
+    def truncate(self, size=None):
+        """Resizes the buffer to the given size, or to the current position.
+        In contrast to :meth:`io.BytesIO.truncate` the buffer is extended by
+        the fill value if the size exceeds it.
+        """
+        if size is None:
+            size = self._position
+        if size < self._size:
+            (last, offset) = divmod(size, self._page_size)
+            for index in [index for index in self._pages if index > last]:
+                del self._pages[index]
+            page = self._pages.get(last)
+            if page is not None:
+                page[offset:] = self._fill(self._page_size - offset)
+        self._size = size
+        return size
+
+    def getvalue(self):
+        """Returns the content of the buffer as :class:`bytes`."""
+        return self._read(0, self._size)
+
+    def _read(self, start, end):
+        chunks = []
+        position = start
+        while position < end:
+            (index, offset) = divmod(position, self._page_size)
+            length = min(self._page_size - offset, end - position)
+            page = self._pages.get(index)
+            if page is None:
+                # Consecutive pages that are not allocated are filled at once.
+                stop = position + length
+                while (stop < end and
+                       stop // self._page_size not in self._pages):
+                    stop = min(end, stop + self._page_size)
+                chunks.append(self._fill(stop - position))
+                position = stop
+                continue
+            chunks.append(bytes(page[offset:offset + length]))
+            position += length
+        return b''.join(chunks)
+
+    def _get_page(self, index):
+        page = self._pages.get(index)
+        if page is None:
+            page = bytearray(self._fill(self._page_size))
+            self._pages[index] = page
+        return page
+
+    def _fill(self, size):
+        if self._value == 0:
+            return bytes(size)
+        return bytes((self._value,)) * size
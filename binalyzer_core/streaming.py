@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+    binalyzer_core.streaming
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the binding of records read from forward-only
+    streams, e.g. pipes and sockets.
+
+    :copyright: 2021 Denis Vasilík
+    :license: MIT
+"""
+import io
+
+from .factory import TemplateFactory
+from .binding import BindingContext
+from .template_provider import TemplateProvider
+from .data_provider import (
+    DataProviderBase,
+    DataProvider,
+)
+
+
+class StreamDataProvider(DataProviderBase):
+    """A data provider reading a forward-only stream. The data read from the
+    stream is buffered until it is discarded, the stream is never seeked.
+
+    :param stream: a binary stream providing a `read` method
+    :param chunk_size: the minimum number of bytes read from the stream at
+                       once
+    """
+
+    def __init__(self, stream, chunk_size=65536):
+        #: The minimum number of bytes read from the stream at once.
+        self.chunk_size = chunk_size
+
+        self._stream = stream
+        self._buffer = bytearray()
+        self._eof = False
+
+    @property
+    def data(self):
+        return self._stream
+
+    @property
+    def size(self):
+        raise RuntimeError('Unable to determine the size of a stream.')
+
+    @property
+    def buffered_size(self):
+        """The number of bytes buffered."""
+        return len(self._buffer)
+
+    def read(self, template):
+        return self.read_at(template.absolute_address, template.size)
+
+    def read_at(self, address, size):
+        self.fill(address + size)
+        return bytes(self._buffer[address:address + size])
+
+    def write(self, template, value):
+        raise RuntimeError('Unable to write to a stream.')
+
+    def write_at(self, address, value):
+        raise RuntimeError('Unable to write to a stream.')
+
+    def fill(self, size):
+        """Reads from the stream until at least the given number of bytes is
+        buffered or the stream ends. Returns the number of bytes buffered.
+        """
+        while len(self._buffer) < size and not self._eof:
+            chunk = self._stream.read(max(self.chunk_size,
+                                          size - len(self._buffer)))
+            if not chunk:
+                self._eof = True
+            self._buffer += chunk
+        return len(self._buffer)
+
+    def discard(self, size):
+        """Removes the given number of bytes from the start of the buffer and
+        returns them. Addresses are relative to the remaining data afterwards.
+        """
+        value = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return value
+
+
+def stream_records(template, stream, chunk_size=65536):
+    """Binds the template to consecutive records of a forward-only stream and
+    yields them one by one. Only the data of the current record is buffered.
+
+    Each record is a DOM bound to a copy of its own data, thus it stays valid
+    after the next record has been read. Templates whose size stretches to
+    the end of the data are not supported, since the size of a stream is
+    unknown.
+
+    :param template: the template describing a record
+    :param stream: a binary stream providing a `read` method
+    :param chunk_size: the minimum number of bytes read from the stream at
+                       once
+    """
+    data_provider = StreamDataProvider(stream, chunk_size)
+    template = TemplateFactory().clone(template)
+    while data_provider.fill(1):
+        binding_context = BindingContext(TemplateProvider(template),
+                                         data_provider,
+                                         propagate=False)
+        record = binding_context.template
+        size = record.absolute_address + record.size + record.padding_after
+        if size <= 0:
+            raise RuntimeError(
+                f"Unable to stream records of '{template.name}' having no "
+                "size."
+            )
+        if data_provider.fill(size) < size:
+            raise RuntimeError(
+                f"Unable to bind '{template.name}', the stream ends within "
+                "the record."
+            )
+        binding_context.data_provider = DataProvider(
+            io.BytesIO(data_provider.discard(size)))
+        yield record
@@ -8,13 +8,20 @@
     :copyright: 2021 Denis Vasilík
     :license: MIT
 """
-from anytree import NodeMixin
+import weakref
+
+from anytree import (
+    NodeMixin,
+    PreOrderIter,
+)
 
 from .binding import BackedBindingContext
+from .factory import TemplateFactory
+from .codec import unpack
+from .template_engine import _template_engine
+from .utils import rightsiblings
 from .properties import (
-    RelativeOffsetReferenceProperty,
     ValueProperty,
-    ReferenceProperty,
     OffsetValueProperty,
     AutoSizeValueProperty,
     RelativeOffsetValueProperty,
@@ -26,27 +33,32 @@ class Template(NodeMixin, object):
     In addition, it inherits :class:`~anytree.node.nodemixin.NodeMixin` of the
     `anytree`_ library making it possible to create template trees.
 
+    Templates are pickled as a compact description of the template tree, see
+    :meth:`~binalyzer.TemplateFactory.spec`. The data a template is bound to
+    is not pickled, an unpickled template is bound to zeroed data and
+    detached from its parent. Pickle the
+    :class:`~binalyzer.BindingContext` to keep the bound data.
+
     .. _anytree: https://anytree.readthedocs.io/en/latest/
     """
 
     def __init__(self, name=None, parent=None, children=None, binding_context=None, **kwargs):
+        self._updating_children = False
+        self._dependents = None
         self._binding_context = binding_context
         if self._binding_context is None:
             self._binding_context = BackedBindingContext(self)
         self._prototype = None
+        self._sibling_index = 0
+        self._absolute_address = None
+        self._array = None
+        self._array_index = 0
 
         #: The name of the template
         self.name = name
 
-        #: Children of the template
-        if children:
-            self.children = children
-
         self._count = ValueProperty(1)
 
-        #: Parent of the template
-        self.parent = parent
-
         #: :class:`~binalyzer.Offset` of the template
         self._offset = RelativeOffsetValueProperty(self)
 
@@ -66,6 +78,16 @@ class Template(NodeMixin, object):
         self._hint = None
         self._text = None
 
+        #: Children of the template
+        if children:
+            self.children = children
+
+        #: Parent of the template
+        self.parent = parent
+
+    def __reduce__(self):
+        return (_create_template, (TemplateFactory().spec(self),))
+
     @property
     def offset(self):
         return self._offset.value
@@ -73,6 +95,7 @@ class Template(NodeMixin, object):
     @offset.setter
     def offset(self, value):
         self._offset = OffsetValueProperty(self, value)
+        self.invalidate_cache()
 
     @property
     def offset_property(self):
@@ -81,7 +104,7 @@ class Template(NodeMixin, object):
     @offset_property.setter
     def offset_property(self, value):
         self._offset = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def size(self):
@@ -90,7 +113,7 @@ class Template(NodeMixin, object):
     @size.setter
     def size(self, value):
         self._size = ValueProperty(value)
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def size_property(self):
@@ -99,7 +122,7 @@ class Template(NodeMixin, object):
     @size_property.setter
     def size_property(self, value):
         self._size = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def padding_before(self):
@@ -108,7 +131,7 @@ class Template(NodeMixin, object):
     @padding_before.setter
     def padding_before(self, value):
         self._padding_before.value = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def padding_before_property(self):
@@ -117,7 +140,7 @@ class Template(NodeMixin, object):
     @padding_before_property.setter
     def padding_before_property(self, value):
         self._padding_before = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def padding_after(self):
@@ -126,7 +149,7 @@ class Template(NodeMixin, object):
     @padding_after.setter
     def padding_after(self, value):
         self._padding_after.value = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def padding_after_property(self):
@@ -135,7 +158,7 @@ class Template(NodeMixin, object):
     @padding_after_property.setter
     def padding_after_property(self, value):
         self._padding_after = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def boundary(self):
@@ -144,7 +167,7 @@ class Template(NodeMixin, object):
     @boundary.setter
     def boundary(self, value):
         self._boundary.value = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def boundary_property(self):
@@ -153,7 +176,7 @@ class Template(NodeMixin, object):
     @boundary_property.setter
     def boundary_property(self, value):
         self._boundary = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def count(self):
@@ -171,7 +194,7 @@ class Template(NodeMixin, object):
     @count_property.setter
     def count_property(self, value):
         self._count = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
         self.binding_context.invalidate()
 
     @property
@@ -181,7 +204,7 @@ class Template(NodeMixin, object):
     @hint.setter
     def hint(self, value):
         self._hint = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def hint_property(self):
@@ -190,7 +213,7 @@ class Template(NodeMixin, object):
     @hint_property.setter
     def hint_property(self, value):
         self._hint = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def signature(self):
@@ -199,7 +222,7 @@ class Template(NodeMixin, object):
     @signature.setter
     def signature(self, value):
         self._signature = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def text(self):
@@ -210,7 +233,7 @@ class Template(NodeMixin, object):
         self._text = value
         if value and isinstance(self.size_property, AutoSizeValueProperty):
             self.size_property = ValueProperty(len(value))
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def signature_property(self):
@@ -219,7 +242,7 @@ class Template(NodeMixin, object):
     @signature_property.setter
     def signature_property(self, value):
         self._signature = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def text_property(self):
@@ -228,25 +251,18 @@ class Template(NodeMixin, object):
     @text_property.setter
     def text_property(self, value):
         self._text = value
-        self.clear_cache(self.root)
+        self.invalidate_cache()
 
     @property
     def absolute_address(self):
         """Provides the absolue address of the template within the binary stream.
-        """
-        if (isinstance(self.offset_property, ValueProperty) or
-            isinstance(self.offset_property, ReferenceProperty)):
-            return self.offset
-
-        if (isinstance(self.offset_property, OffsetValueProperty) or
-                isinstance(self.offset_property, RelativeOffsetValueProperty) or
-                isinstance(self.offset_property, RelativeOffsetReferenceProperty)):
-            if self.parent:
-                return self.offset + self.parent.absolute_address
-            else:
-                return self.offset
 
-        raise TypeError()
+        The address is cached and invalidated along with the offsets and sizes
+        it is derived from.
+        """
+        if self._absolute_address is None:
+            self._absolute_address = _template_engine._get_absolute_address(self)
+        return self._absolute_address
 
     @property
     def value(self):
@@ -262,9 +278,80 @@ class Template(NodeMixin, object):
 
     @value.setter
     def value(self, value):
-        self.size = len(value)
+        self._resize(value)
         self.binding_context.data_provider.write(self, value)
 
+    async def read_value(self):
+        """Reads the :attr:`value` without blocking the event loop using the
+        :attr:`~binalyzer.BindingContext.async_data_provider`.
+        """
+        return await self.binding_context.async_data_provider.read(self)
+
+    async def write_value(self, value):
+        """Writes the :attr:`value` without blocking the event loop using the
+        :attr:`~binalyzer.BindingContext.async_data_provider`.
+        """
+        self._resize(value)
+        await self.binding_context.async_data_provider.write(self, value)
+
+    def _resize(self, value):
+        if (isinstance(self.size_property, ValueProperty) and
+                self.size == len(value)):
+            # The layout stays the same, only templates that refer to the
+            # data of this template need to be invalidated.
+            self._invalidate_templates(list(self._dependents or ()))
+        else:
+            self.size = len(value)
+
+    @property
+    def view(self):
+        """An alternative to :attr:`value` that returns a
+        :class:`memoryview` of the data the template is bound to. The data is
+        not copied if the :attr:`~binalyzer.BindingContext.data_provider`
+        supports it, see :meth:`~binalyzer.DataProvider.read_view`.
+        """
+        return self.binding_context.data_provider.read_view(self)
+
+    @property
+    def sibling_index(self):
+        """The position of the template within the children of its parent.
+
+        The index is maintained on attachment and renumbered lazily for all
+        siblings once a detachment has shifted it, so that looking up a
+        predecessor or successor takes constant time.
+        """
+        if self.parent is None:
+            return 0
+        children = self.parent._child_list
+        index = self._sibling_index
+        if index >= len(children) or children[index] is not self:
+            for (index, child) in enumerate(children):
+                child._sibling_index = index
+            index = self._sibling_index
+        return index
+
+    @property
+    def _child_list(self):
+        # The list of children maintained by anytree. In contrast to the
+        # `children` property no copy is made, thus it must not be modified.
+        return self._NodeMixin__children_or_empty
+
+    def read_all_leaves(self, gap=64):
+        """Reads the values of all leaves of the template using as few reads
+        as possible, see :meth:`~binalyzer.DataProviderBase.read_many`.
+        Returns a list of the values in document order.
+        """
+        leaves = [template for template in PreOrderIter(self)
+                  if template.is_leaf]
+        return self.binding_context.data_provider.read_many(leaves, gap)
+
+    def unpack(self, byteorder='little'):
+        """Decodes the values of all leaves of the template at once, see
+        :func:`~binalyzer.codec.unpack`. Returns a tuple of the values in
+        document order.
+        """
+        return unpack(self, byteorder)
+
     @property
     def binding_context(self):
         """The :class:`~binalyzer.BindingContext` of the template
@@ -277,17 +364,121 @@ class Template(NodeMixin, object):
         self._binding_context.propagate(self)
 
     def _post_attach(self, parent):
+        self._sibling_index = len(parent._child_list) - 1
         self._add_name_to_parent(parent)
         self.binding_context = parent.binding_context
+        if not parent._updating_children:
+            self.invalidate_cache()
+
+    def _pre_detach(self, parent):
+        if not parent._updating_children:
+            self.invalidate_cache()
+
+    def _pre_detach_children(self, children):
+        self._updating_children = True
+
+    def _post_detach_children(self, children):
+        self._updating_children = False
+        self.invalidate_cache()
+
+    def _pre_attach_children(self, children):
+        self._updating_children = True
+
+    def _post_attach_children(self, children):
+        self._updating_children = False
+        self.invalidate_cache()
 
     def _add_name_to_parent(self, parent):
         if self.name:
             parent.__dict__[self.name.replace("-", "_")] = self
 
+    def _add_dependent(self, template):
+        # Registers a template whose cached values are derived from this
+        # template, e.g. through a reference property.
+        if template is self:
+            return
+        if self._dependents is None:
+            self._dependents = weakref.WeakSet()
+        self._dependents.add(template)
+
     def clear_cache(self, template=None):
         if template is None:
             template = self
-        template.offset_property.value_provider.clear_cache()
-        template.size_property.value_provider.clear_cache()
-        for child in template.children:
-            self.clear_cache(child)
+        template.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Invalidates the cached values that depend on the template.
+
+        These are the values of the template and its descendants, the values
+        of its succeeding siblings and their descendants, the sizes of its
+        ancestors and, in turn, everything that depends on those. Templates
+        referring to an invalidated template are invalidated as well.
+        """
+        self._invalidate_templates([self])
+
+    @staticmethod
+    def _invalidate_templates(pending):
+        visited = set()
+        while pending:
+            template = pending.pop()
+            if template in visited:
+                continue
+            visited.add(template)
+            template._invalidate(pending)
+
+    def _invalidate(self, pending):
+        template = self
+        while template is not None:
+            if template._array is not None:
+                template._array.dissolve()
+            template = template.parent
+        self._clear_subtree(pending)
+        template = self
+        while template.parent is not None:
+            for sibling in rightsiblings(template):
+                sibling._clear_subtree(pending)
+            template = template.parent
+            # An ancestor's size that has not been resolved yet, has not been
+            # used to resolve anything else either.
+            if template.size_property.value_provider._cached_value is None:
+                break
+            template.size_property.value_provider.clear_cache()
+            template._notify_dependents(pending)
+
+    def _clear_subtree(self, pending):
+        stack = [self]
+        while stack:
+            template = stack.pop()
+            template._clear_values()
+            template._notify_dependents(pending)
+            stack.extend(template._child_list)
+
+    def _move(self, address):
+        # Moves a template whose layout does not depend on its position. Only
+        # absolute addresses change, offsets and sizes stay valid.
+        self._offset = OffsetValueProperty(self, address)
+        stack = [self]
+        while stack:
+            template = stack.pop()
+            template._absolute_address = None
+            stack.extend(template._child_list)
+
+    def _clear_values(self):
+        # Arrays are only dissolved if the layout of one of their elements
+        # changes, see :meth:`_invalidate`. Their offsets follow from the
+        # first element, whose offset is cleared along with the others.
+        self._absolute_address = None
+        self._offset.value_provider.clear_cache()
+        self._size.value_provider.clear_cache()
+        self._padding_before.value_provider.clear_cache()
+        self._padding_after.value_provider.clear_cache()
+        self._boundary.value_provider.clear_cache()
+        self._count.value_provider.clear_cache()
+
+    def _notify_dependents(self, pending):
+        if self._dependents:
+            pending.extend(self._dependents)
+
+
+def _create_template(spec):
+    return TemplateFactory().create(spec)
@@ -8,9 +8,15 @@
     :copyright: 2021 Denis Vasilík
     :license: MIT
 """
-from anytree.util import rightsibling
+from anytree import PreOrderIter
 
-from .utils import rightsiblings
+from .utils import (
+    _get_children,
+    _get_sibling_index,
+    leftsibling,
+    rightsibling,
+    rightsiblings,
+)
 
 
 class TemplateEngine(object):
@@ -22,6 +28,11 @@ class TemplateEngine(object):
         boundary into account. It is possible to ignore the boundary by setting
         `ìgnore_boundary` to `True`.
         """
+        if template._array is not None and template._array_index:
+            return template._array.get_offset(template._array_index)
+
+        self._resolve_predecessors(template)
+
         offset = template.padding_before
 
         if not ignore_boundary:
@@ -38,10 +49,88 @@ class TemplateEngine(object):
         """Returns the actual size of the given template taking a given boundary
         into account.
         """
+        if template._array is not None and template._array_index:
+            return template._array.get_size(template._array_index)
         size = self.get_size_of_children(template.children)
         size = self._get_multiple_of_boundary(size, template.boundary)
         return size
 
+    def layout(self, template):
+        """Resolves offset, size and absolute address of the given template and
+        all of its descendants in a single ordered walk.
+
+        Templates are visited in document order, so the offset of a template is
+        resolved after its parent's offset and its predecessor's size, and the
+        size of a template is resolved after all of its children. The results
+        are stored in the caches of the value providers, which keeps subsequent
+        reads constant in time. Returns a dictionary mapping each template to
+        its absolute address, which is cached by the template as well.
+        """
+        addresses = {}
+        stack = [(template, False)]
+        while stack:
+            (current, resolved) = stack.pop()
+            if resolved:
+                # Reading the size caches it.
+                current.size  # pylint: disable=pointless-statement
+                continue
+            addresses[current] = current.absolute_address
+            stack.append((current, True))
+            stack.extend((child, False) for child in reversed(current.children))
+        return addresses
+
+    def has_fixed_layout(self, template):
+        """Returns :const:`True` if the layout of the given template does not
+        depend on its position or on the data it is bound to; otherwise
+        :const:`False`. Copies of such a template placed one after another
+        form an array with a fixed stride.
+        """
+        from .properties import (
+            ValueProperty,
+            OffsetValueProperty,
+            AutoSizeValueProperty,
+            RelativeOffsetValueProperty,
+        )
+
+        if not isinstance(template.offset_property, RelativeOffsetValueProperty):
+            return False
+        for current in PreOrderIter(template):
+            if (current is not template and
+                not isinstance(current.offset_property,
+                               (RelativeOffsetValueProperty, OffsetValueProperty))):
+                return False
+            if not isinstance(current.size_property,
+                              (ValueProperty, AutoSizeValueProperty)):
+                return False
+            for value_property in (current.padding_before_property,
+                                   current.padding_after_property,
+                                   current.boundary_property,
+                                   current.count_property):
+                if not isinstance(value_property, ValueProperty):
+                    return False
+            if current.boundary or current.hint is not None:
+                return False
+        return True
+
+    def get_array_layout(self, elements):
+        """Returns the absolute address of the first element and the stride of
+        the given array elements, which are either a
+        :class:`~binalyzer.VirtualArray` or the list of an expanded template.
+        Returns :const:`None` if the elements are not equally spaced.
+        """
+        first = elements[0]
+        if hasattr(elements, 'get_address'):
+            return (elements.get_address(0), elements.stride)
+        if len(elements) == 1:
+            return (first.absolute_address, first.size)
+        if first._array is not None:
+            return (first.absolute_address, first._array.stride)
+        stride = elements[1].absolute_address - first.absolute_address
+        for (index, element) in enumerate(elements):
+            if element.absolute_address != first.absolute_address + index * stride:
+                return None
+        return (first.absolute_address, stride)
+
     def get_size_of_siblings(self, siblings):
         # Siblings represent only a part of a template's children. Thus, their
         # size is determined using padding before, padding after, and their size.
@@ -87,12 +176,30 @@ class TemplateEngine(object):
         elif template.parent and template.parent.boundary > 0:
             return template.parent.boundary - template.offset
         elif template.binding_context.data:
-            data = template.binding_context.data
-            data.seek(0, 2)
-            return data.tell()
+            return template.binding_context.data_provider.size
         else:
             return 0
 
+    def _get_absolute_address(self, template):
+        from .properties import (
+            ValueProperty,
+            ReferenceProperty,
+            OffsetValueProperty,
+            RelativeOffsetValueProperty,
+        )
+
+        offset_property = template.offset_property
+        if isinstance(offset_property, (ValueProperty, ReferenceProperty)):
+            return template.offset
+
+        if isinstance(offset_property, (OffsetValueProperty,
+                                        RelativeOffsetValueProperty)):
+            if template.parent is None:
+                return template.offset
+            return template.offset + template.parent.absolute_address
+
+        raise TypeError()
+
     def _get_multiple_of_boundary(self, value, boundary):
         if boundary == 0:
             return value
@@ -101,25 +208,37 @@ class TemplateEngine(object):
             boundary_multiplier += 1
         return boundary_multiplier * boundary
 
+    def _resolve_predecessors(self, template):
+        # Resolves unresolved relative offsets of predecessors in order,
+        # starting after the nearest resolved one. Otherwise, each offset
+        # would recursively resolve the offset of its predecessor, exceeding
+        # the recursion limit for wide templates.
+        from .value_provider import RelativeOffsetValueProvider
+
+        index = _get_sibling_index(template)
+        if not index:
+            return
+        siblings = _get_children(template.parent)
+        start = index - 1
+        while start > 0:
+            value_provider = siblings[start].offset_property.value_provider
+            if (not isinstance(value_provider, RelativeOffsetValueProvider) or
+                    value_provider._cached_value is not None):
+                break
+            start -= 1
+        for sibling in siblings[start:index - 1]:
+            sibling.offset  # pylint: disable=pointless-statement
+            sibling.size  # pylint: disable=pointless-statement
+
     def _get_offset_at_end_of_predecessor(self, template):
-        # Need at least two children to grab previous sibling
-        if template.parent and len(template.parent.children) >= 2:
-            index = 0
-            for (count, value) in enumerate(template.parent.children):
-                if value == template:
-                    index = count
-                    break
-            if index == 0:
-                return 0
-            else:
-                previous_sibling = template.parent.children[index - 1]
-                return (
-                    previous_sibling.offset
-                    + previous_sibling.size
-                    + previous_sibling.padding_after
-                )
-        else:
+        previous_sibling = leftsibling(template)
+        if previous_sibling is None:
             return 0
+        return (
+            previous_sibling.offset
+            + previous_sibling.size
+            + previous_sibling.padding_after
+        )
 
     def _get_boundary_offset_relative_to_parent(self, template):
         if template.parent:
@@ -137,3 +256,43 @@ class TemplateEngine(object):
             return boundary - (offset % boundary)
         else:
             return 0
+
+
+class FixedStrideArray(object):
+    """Describes the elements of an expanded template whose layout is fixed,
+    see :meth:`TemplateEngine.has_fixed_layout`. The offset and size of each
+    element is derived from the first element, which avoids resolving the
+    chain of predecessors.
+
+    The array is dissolved as soon as the layout of one of its elements is
+    modified.
+    """
+
+    def __init__(self, elements):
+        self.elements = elements
+        for (index, element) in enumerate(elements):
+            element._array = self
+            element._array_index = index
+
+    @property
+    def stride(self):
+        """The distance between the offsets of two consecutive elements.
+        """
+        first = self.elements[0]
+        return first.padding_before + first.size + first.padding_after
+
+    def get_offset(self, index):
+        return self.elements[0].offset + index * self.stride
+
+    def get_size(self, index):
+        return self.elements[0].size
+
+    def dissolve(self):
+        for element in self.elements:
+            element._array = None
+            element._array_index = 0
+        self.elements = []
+
+
+# The template engine does not hold any state, thus a single instance is shared.
+_template_engine = TemplateEngine()
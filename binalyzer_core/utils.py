@@ -9,7 +9,6 @@
     :license: MIT
 """
 from anytree import NodeMixin
-from anytree.util import leftsibling, rightsibling
 
 
 def siblings(node: NodeMixin):
@@ -19,20 +18,48 @@ def siblings(node: NodeMixin):
     return siblings
 
 
+def leftsibling(node: NodeMixin):
+    index = _get_sibling_index(node)
+    if index:
+        return _get_children(node.parent)[index - 1]
+    return None
+
+
+def rightsibling(node: NodeMixin):
+    index = _get_sibling_index(node)
+    if index is None:
+        return None
+    children = _get_children(node.parent)
+    if index + 1 < len(children):
+        return children[index + 1]
+    return None
+
+
 def leftsiblings(node: NodeMixin):
-    siblings = []
-    sibling = leftsibling(node)
-    while sibling:
-        siblings.append(sibling)
-        sibling = leftsibling(sibling)
-    siblings.reverse()
-    return siblings
+    index = _get_sibling_index(node)
+    if index is None:
+        return []
+    return list(_get_children(node.parent)[:index])
 
 
 def rightsiblings(node: NodeMixin):
-    siblings = []
-    sibling = rightsibling(node)
-    while sibling:
-        siblings.append(sibling)
-        sibling = rightsibling(sibling)
-    return siblings
+    index = _get_sibling_index(node)
+    if index is None:
+        return []
+    return list(_get_children(node.parent)[index + 1:])
+
+
+def _get_children(node: NodeMixin):
+    # Templates expose the list maintained by anytree, which avoids building a
+    # new tuple on every access of `children`.
+    if hasattr(node, "_child_list"):
+        return node._child_list
+    return node.children
+
+
+def _get_sibling_index(node: NodeMixin):
+    if node.parent is None:
+        return None
+    if hasattr(node, "sibling_index"):
+        return node.sibling_index
+    return node.parent.children.index(node)
@@ -8,7 +8,8 @@
     :copyright: 2021 Denis Vasilík
     :license: MIT
 """
-from .template_engine import TemplateEngine
+from .template_engine import _template_engine
+from .utils import rightsiblings
 
 
 def value_cache(func):
@@ -70,10 +71,6 @@ class TemplateValueProvider(ValueProviderBase):
 
 class OffsetValueProvider(ValueProvider):
 
-    def __init__(self, property):
-        self._engine = TemplateEngine()
-        super(OffsetValueProvider, self).__init__(property)
-
     @value_cache
     def get_value(self):
         absolute_address = 0
@@ -81,7 +78,7 @@ class OffsetValueProvider(ValueProvider):
         if template.parent:
             absolute_address += template.parent.absolute_address
         absolute_address += self._value
-        absolute_address += self._engine._get_boundary_offset(
+        absolute_address += _template_engine._get_boundary_offset(
             absolute_address, template.boundary
         )
         if template.parent:
@@ -98,12 +95,11 @@ class RelativeOffsetValueProvider(ValueProviderBase):
 
     def __init__(self, property):
         self.ignore_boundary = False
-        self._engine = TemplateEngine()
         super(RelativeOffsetValueProvider, self).__init__(property)
 
     @value_cache
     def get_value(self):
-        return self._engine.get_offset(self.property.template,
+        return _template_engine.get_offset(self.property.template,
                                        self.ignore_boundary)
 
     def set_value(self, value):
@@ -116,7 +112,6 @@ class RelativeOffsetReferenceValueProvider(ValueProviderBase):
 
     def __init__(self, property):
         self.byteorder = 'little'
-        self._engine = TemplateEngine()
         super(RelativeOffsetReferenceValueProvider, self).__init__(property)
 
     @value_cache
@@ -133,13 +128,9 @@ class RelativeOffsetReferenceValueProvider(ValueProviderBase):
 
 class AutoSizeValueProvider(ValueProviderBase):
 
-    def __init__(self, property):
-        self._engine = TemplateEngine()
-        super(AutoSizeValueProvider, self).__init__(property)
-
     @value_cache
     def get_value(self):
-        return self._engine.get_size(self.property.template)
+        return _template_engine.get_size(self.property.template)
 
     def set_value(self, value):
         raise RuntimeError('Not supported')
@@ -147,13 +138,16 @@ class AutoSizeValueProvider(ValueProviderBase):
 
 class StretchSizeValueProvider(ValueProvider):
 
-    def __init__(self, property):
-        self._engine = TemplateEngine()
-        super(StretchSizeValueProvider, self).__init__(property)
-
     @value_cache
     def get_value(self):
-        return self._engine.get_max_size(self.property.template)
+        template = self.property.template
+        # The maximum size depends on the parent and the succeeding siblings,
+        # thus the template needs to be invalidated whenever they change.
+        if template.parent:
+            template.parent._add_dependent(template)
+        for sibling in rightsiblings(template):
+            sibling._add_dependent(template)
+        return _template_engine.get_max_size(template)
 
     def set_value(self, value):
         raise RuntimeError('Not supported')
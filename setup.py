@@ -34,5 +34,8 @@ setuptools.setup(
     install_requires=[
         "anytree>=2.8.0",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     entry_points={},
 )
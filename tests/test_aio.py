@@ -0,0 +1,88 @@
+"""
+    test_aio
+    ~~~~~~~~
+
+    This module implements tests for the aio module.
+"""
+import io
+import asyncio
+import pytest
+
+from binalyzer_core import (
+    Binalyzer,
+    Template,
+    DataProvider,
+    PositionalDataProvider,
+    AsyncDataProviderBase,
+    ThreadPoolDataProvider,
+)
+
+
+@pytest.fixture
+def template():
+    root = Template(name='root')
+    Template(name='a', parent=root).size = 2
+    Template(name='b', parent=root).size = 4
+    return root
+
+
+def test_read_value(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(6))))
+    value = asyncio.run(binalyzer.template.b.read_value())
+    assert value == bytes([2, 3, 4, 5])
+
+
+def test_write_value(template):
+    data = io.BytesIO(bytes(6))
+    binalyzer = Binalyzer(template, data)
+    asyncio.run(binalyzer.template.a.write_value(bytes([1, 2])))
+    assert data.getvalue() == bytes([1, 2, 0, 0, 0, 0])
+
+
+def test_write_value_resizes_template(template):
+    data = io.BytesIO(bytes(6))
+    binalyzer = Binalyzer(template, data)
+    dom = binalyzer.template
+    asyncio.run(dom.a.write_value(bytes([1, 2, 3])))
+    assert dom.b.offset == 3
+
+
+def test_read_values(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(6))))
+    dom = binalyzer.template
+    values = asyncio.run(binalyzer.read_values([dom.b, dom.a]))
+    assert values == [bytes([2, 3, 4, 5]), bytes([0, 1])]
+
+
+def test_async_data_provider_follows_data_provider(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(6)))
+    data_provider = PositionalDataProvider(bytes(range(6)))
+    binalyzer.data_provider = data_provider
+    assert binalyzer.async_data_provider.data_provider is data_provider
+    value = asyncio.run(binalyzer.template.a.read_value())
+    assert value == bytes([0, 1])
+
+
+def test_custom_async_data_provider(template):
+    class ConstantDataProvider(AsyncDataProviderBase):
+        async def read(self, template):
+            return bytes([0xFF] * template.size)
+
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(6)))
+    binalyzer.async_data_provider = ConstantDataProvider()
+    dom = binalyzer.template
+    values = asyncio.run(binalyzer.read_values([dom.a, dom.b]))
+    assert values == [bytes([0xFF] * 2), bytes([0xFF] * 4)]
+
+
+def test_thread_pool_data_provider_serializes_unsafe_providers():
+    data_provider = DataProvider(io.BytesIO(bytes(range(256))))
+    root = Template(name='root')
+    field = Template(name='field', parent=root)
+    field.size = 1
+    field.count = 256
+    binalyzer = Binalyzer(root, data_provider)
+    fields = binalyzer.template.field
+    async_data_provider = ThreadPoolDataProvider(data_provider)
+    values = asyncio.run(async_data_provider.read_many(fields))
+    assert values == [bytes([i]) for i in range(256)]
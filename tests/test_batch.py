@@ -0,0 +1,146 @@
+"""
+    test_batch
+    ~~~~~~~~~~
+
+    This module implements tests for the batch module.
+"""
+import os
+import pytest
+
+from binalyzer_core import (
+    Template,
+    ReferenceProperty,
+    bind_many,
+)
+
+
+@pytest.fixture
+def template():
+    root = Template(name='root')
+    Template(name='a', parent=root).size = 2
+    Template(name='b', parent=root).size = 1
+    return root
+
+
+def _create_files(tmp_path, count):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f'{index}.bin'
+        path.write_bytes(bytes([index, 0, index + 1]))
+        paths.append(str(path))
+    return paths
+
+
+def _extract_b(result):
+    return result['b']
+
+
+def _crash_on_third_file(result):
+    if result['a'] == 2:
+        os._exit(1)
+    return result['b']
+
+
+def test_bind_many(tmp_path, template):
+    paths = _create_files(tmp_path, 10)
+    results = list(bind_many(template, paths, workers=2,
+                             max_pending=3))
+    assert [result.path for result in results] == paths
+    assert [result.result for result in results] == [
+        {'a': index, 'b': index + 1} for index in range(10)
+    ]
+    assert all(result.error is None for result in results)
+
+
+def test_bind_many_with_extract(tmp_path, template):
+    paths = _create_files(tmp_path, 4)
+    results = bind_many(template, paths, workers=2,
+                        extract=_extract_b)
+    assert [result.result for result in results] == [1, 2, 3, 4]
+
+
+def test_bind_many_reports_errors_per_file(tmp_path, template):
+    paths = _create_files(tmp_path, 3)
+    (tmp_path / 'short.bin').write_bytes(bytes(1))
+    paths.insert(1, str(tmp_path / 'short.bin'))
+    paths.append(str(tmp_path / 'missing.bin'))
+    results = list(bind_many(template, paths, workers=2))
+    assert [result.error is None for result in results] == [
+        True, False, True, True, False,
+    ]
+    assert isinstance(results[1].error, RuntimeError)
+    assert isinstance(results[4].error, FileNotFoundError)
+
+
+def test_bind_many_recovers_from_dying_workers(tmp_path, template):
+    paths = _create_files(tmp_path, 6)
+    results = list(bind_many(template, paths, workers=2,
+                             extract=_crash_on_third_file))
+    assert [result.result for result in results] == [1, 2, None, 4, 5, 6]
+    assert results[2].error is not None
+
+
+def test_bind_many_of_template_depending_on_data(tmp_path):
+    root = Template(name='root')
+    size = Template(name='size', parent=root)
+    size.size = 1
+    payload = Template(name='payload', parent=root)
+    payload.size_property = ReferenceProperty(payload, 'size')
+    paths = []
+    for (index, value) in enumerate([bytes([2, 1, 2]), bytes([3, 1, 2, 3]),
+                                     bytes([3, 1])]):
+        path = tmp_path / f'{index}.bin'
+        path.write_bytes(value)
+        paths.append(str(path))
+    results = list(bind_many(root, paths, workers=2))
+    assert results[0].result == {'size': 2, 'payload': 0x0201}
+    assert results[1].result == {'size': 3, 'payload': bytes([1, 2, 3])}
+    assert isinstance(results[2].error, RuntimeError)
+
+
+def test_bind_many_of_array(tmp_path):
+    root = Template(name='root')
+    Template(name='n', parent=root).size = 1
+    entry = Template(name='e', parent=root)
+    entry.count = 3
+    Template(name='a', parent=entry).size = 2
+    path = tmp_path / 'array.bin'
+    path.write_bytes(bytes(range(7)))
+    (result,) = bind_many(root, [str(path)], workers=1)
+    assert result.result == {
+        'n': 0,
+        'e-0': {'a': 0x0201},
+        'e-1': {'a': 0x0403},
+        'e-2': {'a': 0x0605},
+    }
+
+
+def test_bind_many_of_array_depending_on_data(tmp_path):
+    root = Template(name='root')
+    Template(name='n', parent=root).size = 1
+    entry = Template(name='e', parent=root)
+    entry.count_property = ReferenceProperty(entry, 'n')
+    Template(name='a', parent=entry).size = 2
+    paths = []
+    for (index, value) in enumerate([bytes([1, 1, 2]),
+                                     bytes([2, 1, 2, 3, 4])]):
+        path = tmp_path / f'{index}.bin'
+        path.write_bytes(value)
+        paths.append(str(path))
+    results = list(bind_many(root, paths, workers=1))
+    assert results[0].result == {'n': 1, 'e': {'a': 0x0201}}
+    assert results[1].result == {
+        'n': 2,
+        'e-0': {'a': 0x0201},
+        'e-1': {'a': 0x0403},
+    }
+
+
+def test_bind_many_of_template_with_offset(tmp_path):
+    root = Template(name='root')
+    root.offset = 4
+    Template(name='x', parent=root).size = 2
+    path = tmp_path / 'offset.bin'
+    path.write_bytes(bytes(range(8)))
+    (result,) = bind_many(root, [str(path)], workers=1)
+    assert result.result == {'x': 0x0504}
@@ -395,3 +395,53 @@ class MockExtension(BinalyzerExtension):
 
     def dispose(self):
         self.disposed = True
+
+
+def _create_record_template():
+    record = Template(name='record')
+    header = Template(name='header', parent=record)
+    header.size = 2
+    payload = Template(name='payload', parent=record)
+    payload.size = 2
+    return record
+
+
+def test_iter_records_reuses_fixed_layout_record():
+    binalyzer = Binalyzer(data=io.BytesIO(bytes(range(12))))
+    records = binalyzer.iter_records(_create_record_template())
+    first = next(records)
+    assert first.payload.value == bytes([2, 3])
+    second = next(records)
+    assert second is first
+    assert second.header.value == bytes([4, 5])
+    assert [record.payload.value for record in records] == [bytes([10, 11])]
+
+
+def test_iter_records_rebinds_variable_layout_record():
+    record = Template(name='record')
+    length = Template(name='length', parent=record)
+    length.size = 1
+    payload = Template(name='payload', parent=record)
+    payload.size_property = ReferenceProperty(payload, 'length')
+    binalyzer = Binalyzer(data=io.BytesIO(bytes([2, 0xA, 0xB, 0, 1, 0xC])))
+    values = [record.payload.value for record in binalyzer.iter_records(record)]
+    assert values == [bytes([0xA, 0xB]), b'', bytes([0xC])]
+
+
+def test_iter_records_from_offset():
+    binalyzer = Binalyzer(data=io.BytesIO(bytes(range(10))))
+    records = list(record.header.value for record in
+                   binalyzer.iter_records(_create_record_template(), 2))
+    assert records == [bytes([2, 3]), bytes([6, 7])]
+
+
+def test_iter_records_of_truncated_data():
+    binalyzer = Binalyzer(data=io.BytesIO(bytes(6)))
+    with pytest.raises(RuntimeError):
+        list(binalyzer.iter_records(_create_record_template()))
+
+
+def test_iter_records_of_empty_record():
+    binalyzer = Binalyzer(data=io.BytesIO(bytes(6)))
+    with pytest.raises(RuntimeError):
+        list(binalyzer.iter_records(Template(name='record')))
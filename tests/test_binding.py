@@ -5,6 +5,7 @@
     This module implements tests for the context module.
 """
 import io
+import pickle
 import pytest
 
 from anytree import findall
@@ -13,6 +14,9 @@ from binalyzer_core import (
     Binalyzer,
     Template,
     TemplateFactory,
+    BindingEngine,
+    VirtualArray,
+    ReferenceProperty,
 )
 
 
@@ -161,3 +165,210 @@ def test_template_validation_failed_nested(binalyzer):
 
     with pytest.raises(RuntimeError):
         binalyzer.template
+
+
+def test_fixed_stride_array(binalyzer):
+    tom = Template(name='a')
+    b = Template(name='b', parent=tom)
+    c = Template(name='c', parent=b)
+    d = Template(name='d', parent=b)
+    c.size = 1
+    d.size = 2
+    d.padding_after = 1
+    b.count = 1000
+
+    binalyzer.template = tom
+    dom = binalyzer.template
+
+    assert dom.b[0]._array is dom.b[999]._array
+    assert dom.b[0]._array.stride == 4
+    assert dom.b[999].offset == 3996
+    assert dom.b[999].d.absolute_address == 3997
+    assert dom.size == 4000
+
+
+def test_fixed_stride_array_dissolved_on_modification(binalyzer):
+    tom = Template(name='a')
+    b = Template(name='b', parent=tom)
+    c = Template(name='c', parent=b)
+    c.size = 2
+    b.count = 4
+
+    binalyzer.template = tom
+    dom = binalyzer.template
+    dom.b[1].c.size = 4
+
+    assert dom.b[0]._array is None
+    assert dom.b[3]._array is None
+    assert dom.b[2].offset == 6
+    assert dom.b[3].offset == 8
+    assert dom.size == 10
+
+
+def test_fixed_stride_array_kept_on_modification_of_predecessor(binalyzer):
+    tom = Template(name='a')
+    header = Template(name='header', parent=tom)
+    header.size = 2
+    b = Template(name='b', parent=tom)
+    c = Template(name='c', parent=b)
+    c.size = 2
+    b.count = 4
+
+    binalyzer.template = tom
+    dom = binalyzer.template
+    dom.header.size = 3
+
+    assert dom.b[0]._array is not None
+    assert dom.b[3]._array is dom.b[0]._array
+    assert dom.b[0].offset == 3
+    assert dom.b[3].offset == 9
+    assert dom.b[3].c.absolute_address == 9
+    assert dom.size == 11
+
+
+def test_array_with_data_dependent_layout_has_no_fixed_stride(binalyzer):
+    tom = Template(name='a')
+    size = Template(name='size', parent=tom)
+    size.size = 1
+    b = Template(name='b', parent=tom)
+    b.size_property = ReferenceProperty(b, 'size')
+    b.count = 2
+
+    binalyzer.template = tom
+    binalyzer.data = io.BytesIO(bytes([0x02, 0x00, 0x00, 0x00, 0x00]))
+    dom = binalyzer.template
+
+    assert dom.b[0]._array is None
+    assert dom.b[1].offset == 3
+
+
+def test_virtual_array(binalyzer):
+    tom = Template(name='a')
+    b = Template(name='b', parent=tom)
+    c = Template(name='c', parent=b)
+    d = Template(name='d', parent=b)
+    e = Template(name='e', parent=tom)
+    c.size = 1
+    d.size = 3
+    e.size = 2
+    b.count = 1000000
+
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=1000,
+                                             virtual_array_cache_size=2)
+    binalyzer.template = tom
+    dom = binalyzer.template
+
+    assert isinstance(dom.b, VirtualArray)
+    assert len(dom.b) == 1000000
+    assert len(dom.children) == 2
+    assert dom.e.offset == 4000000
+    assert dom.size == 4000002
+    assert dom.b[999999].name == 'b-999999'
+    assert dom.b[999999].d.absolute_address == 3999997
+    assert dom.b[-1].d.absolute_address == 3999997
+    assert [element.c.absolute_address for element in dom.b[1:3]] == [4, 8]
+
+
+def test_virtual_array_element_value(binalyzer):
+    tom = Template(name='a')
+    b = Template(name='b', parent=tom)
+    b.size = 2
+    b.count = 4
+
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=2)
+    binalyzer.template = tom
+    binalyzer.data = io.BytesIO(bytes(range(8)))
+    dom = binalyzer.template
+
+    assert dom.b[2].value == bytes([0x04, 0x05])
+    with pytest.raises(IndexError):
+        dom.b[4]
+
+
+def test_virtual_array_element_validation(binalyzer):
+    tom = Template(name='a')
+    b = Template(name='b', parent=tom)
+    b.size = 1
+    b.signature = bytes([0x01])
+    b.count = 3
+
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=2)
+    binalyzer.template = tom
+    binalyzer.data = io.BytesIO(bytes([0x01, 0x01, 0x02]))
+    dom = binalyzer.template
+
+    assert dom.b[1].value == bytes([0x01])
+    with pytest.raises(RuntimeError):
+        dom.b[2]
+
+
+def test_template_transformations_in_document_order(binalyzer):
+    tom = Template(name='a')
+    b = Template(name='b', parent=tom)
+    c = Template(name='c', parent=tom)
+    d = Template(name='d', parent=tom)
+    e = Template(name='e', parent=d)
+    b.size = 1
+    b.signature = bytes([0x02])
+    b.hint = 'optional'
+    c.size = 1
+    c.signature = bytes([0x01])
+    c.hint = 'optional'
+    d.count = 2
+    e.size = 1
+    e.count = 3
+
+    binalyzer.template = tom
+    binalyzer.data = io.BytesIO(bytes([0x01] * 7))
+    dom = binalyzer.template
+
+    assert [child.name for child in dom.children] == ['c', 'd-0', 'd-1']
+    assert [child.name for child in dom.d[1].children] == ['e-0', 'e-1', 'e-2']
+    assert dom.d[1].e[2].absolute_address == 6
+
+
+def _create_fixed_template():
+    root = Template(name='root')
+    entry = Template(name='entry', parent=root)
+    Template(name='x', parent=entry).size = 2
+    Template(name='y', parent=entry).size = 2
+    entry.count = 8
+    return root
+
+
+def test_pickle_binding_engine():
+    binding_engine = pickle.loads(pickle.dumps(
+        BindingEngine(virtual_array_threshold=4, virtual_array_cache_size=8)))
+    assert binding_engine.virtual_array_threshold == 4
+    assert binding_engine.virtual_array_cache_size == 8
+
+
+def test_pickle_binding_context():
+    binalyzer = Binalyzer(_create_fixed_template(), io.BytesIO(bytes(range(64))))
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=2)
+    binding_context = pickle.loads(pickle.dumps(binalyzer._binding_context))
+    template = binding_context.template
+    assert template.binding_context is binding_context
+    assert binding_context.binding_engine.virtual_array_threshold == 2
+    assert isinstance(template.entry, VirtualArray)
+    assert template.entry[1].value == binalyzer.template.entry[1].value
+
+
+def test_pickle_bound_binding_context():
+    binalyzer = Binalyzer(_create_fixed_template(), io.BytesIO(bytes(range(64))))
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=2)
+    expected = binalyzer.template.entry[1].value
+    binding_context = pickle.loads(pickle.dumps(binalyzer._binding_context))
+    template = binding_context.template
+    assert template.binding_context is binding_context
+    assert isinstance(template.entry, VirtualArray)
+    assert template.entry[1].value == expected
+
+
+def test_pickle_virtual_array():
+    binalyzer = Binalyzer(_create_fixed_template(), io.BytesIO(bytes(range(64))))
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=2)
+    template = pickle.loads(pickle.dumps(binalyzer.template))
+    assert isinstance(template.entry, VirtualArray)
+    assert len(template.entry) == len(binalyzer.template.entry)
+    assert template.entry.stride == binalyzer.template.entry.stride
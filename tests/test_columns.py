@@ -0,0 +1,91 @@
+"""
+    test_columns
+    ~~~~~~~~~~~~
+
+    This module implements tests for the columns module.
+"""
+import io
+import array
+import pytest
+
+from binalyzer_core import (
+    Binalyzer,
+    BindingEngine,
+    Template,
+)
+from binalyzer_core.columns import extract_column
+
+
+@pytest.fixture
+def template():
+    root = Template(name='root')
+    entry = Template(name='entry', parent=root)
+    header = Template(name='header', parent=entry)
+    Template(name='x', parent=header).size = 2
+    Template(name='y', parent=entry).size = 4
+    entry.padding_after = 2
+    entry.count = 4
+    return root
+
+
+def _expected(entries, path, byteorder='little'):
+    values = []
+    for entry in entries:
+        field = entry
+        for name in path.split('.'):
+            field = getattr(field, name)
+        values.append(int.from_bytes(field.value, byteorder))
+    return values
+
+
+def test_extract_column_as_array(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(32))))
+    entries = binalyzer.template.entry
+    column = extract_column(entries, 'header.x')
+    assert isinstance(column, array.array)
+    assert list(column) == _expected(entries, 'header.x')
+    assert list(extract_column(entries, 'y')) == _expected(entries, 'y')
+
+
+def test_extract_column_big_endian(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(32))))
+    entries = binalyzer.template.entry
+    column = extract_column(entries, 'y', byteorder='big')
+    assert list(column) == _expected(entries, 'y', 'big')
+
+
+def test_extract_column_as_bytes(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(32))))
+    entries = binalyzer.template.entry
+    column = extract_column(entries, 'y', kind='bytes')
+    assert column == [entry.y.value for entry in entries]
+
+
+def test_extract_column_of_virtual_array(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(32))))
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=2)
+    column = extract_column(binalyzer.template.entry, 'header.x')
+    assert list(column) == [0x0100, 0x0908, 0x1110, 0x1918]
+
+
+def test_extract_column_of_unequally_spaced_elements(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(32))))
+    entries = binalyzer.template.entry
+    elements = [entries[3], entries[0], entries[2]]
+    column = extract_column(elements, 'y', kind='bytes')
+    assert column == [entry.y.value for entry in elements]
+
+
+def test_extract_column_as_numpy(template):
+    np = pytest.importorskip('numpy')
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(32))))
+    entries = binalyzer.template.entry
+    column = extract_column(entries, 'y', kind='numpy')
+    assert column.dtype == np.dtype('<u4')
+    assert list(column) == _expected(entries, 'y')
+
+
+def test_extract_column_of_unknown_field(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(32))))
+    with pytest.raises(RuntimeError):
+        extract_column(binalyzer.template.entry, 'z')
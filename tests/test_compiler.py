@@ -0,0 +1,150 @@
+"""
+    test_compiler
+    ~~~~~~~~~~~~~
+
+    This module implements tests for the compiler module.
+"""
+import io
+import pickle
+import pytest
+
+from binalyzer_core import (
+    Binalyzer,
+    Template,
+    TemplateCompiler,
+    ReferenceProperty,
+)
+
+
+@pytest.fixture
+def compiler():
+    return TemplateCompiler()
+
+
+def _interpret(template):
+    if template.is_leaf:
+        value = template.value
+        if len(value) in (1, 2, 4, 8):
+            return int.from_bytes(value, 'little')
+        return value
+    return {child.name: _interpret(child) for child in template.children}
+
+
+@pytest.fixture
+def template():
+    root = Template(name='root')
+    header = Template(name='header', parent=root)
+    Template(name='magic', parent=header).size = 4
+    Template(name='version', parent=header).size = 2
+    Template(name='label', parent=header).size = 3
+    entry = Template(name='entry', parent=root)
+    Template(name='x', parent=entry).size = 2
+    Template(name='y', parent=entry).size = 1
+    entry.padding_after = 1
+    entry.count = 3
+    return root
+
+
+def test_compiled_parser_matches_binalyzer(compiler, template):
+    data = bytes(range(32))
+    binalyzer = Binalyzer(template, io.BytesIO(data))
+    parser = compiler.compile(binalyzer.template)
+    assert parser.size == 21
+    assert parser.parse(data) == _interpret(binalyzer.template)
+
+
+def test_compiled_parser_with_base_address(compiler, template):
+    data = bytes(range(32))
+    binalyzer = Binalyzer(template, io.BytesIO(data))
+    parser = compiler.compile(binalyzer.template)
+    result = parser.parse(memoryview(data), 4)
+    assert result['header']['magic'] == int.from_bytes(data[4:8], 'little')
+    assert result['entry-2']['y'] == data[4 + 19]
+
+
+def test_compiled_parser_big_endian():
+    template = Template(name='root')
+    Template(name='value', parent=template).size = 2
+    parser = TemplateCompiler('big').compile(template)
+    assert parser.parse(bytes([0x01, 0x02])) == {'value': 0x0102}
+
+
+def test_compiled_parser_is_reused(compiler, template):
+    first = Binalyzer(template).template
+    second = Binalyzer(template).template
+    assert compiler.compile(first) is compiler.compile(second)
+
+
+def test_compiled_parser_is_picklable(compiler, template):
+    data = bytes(range(32))
+    parser = compiler.compile(Binalyzer(template).template)
+    duplicate = pickle.loads(pickle.dumps(parser))
+    assert duplicate.parse(data) == parser.parse(data)
+
+
+def test_compiled_parser_rejects_small_buffer(compiler, template):
+    parser = compiler.compile(Binalyzer(template).template)
+    with pytest.raises(RuntimeError):
+        parser.parse(bytes(4))
+
+
+def test_compile_data_dependent_template(compiler):
+    template = Template(name='root')
+    size = Template(name='size', parent=template)
+    size.size = 1
+    payload = Template(name='payload', parent=template)
+    payload.size_property = ReferenceProperty(payload, 'size')
+    with pytest.raises(RuntimeError):
+        compiler.compile(template)
+
+
+def test_compile_unbound_template(compiler):
+    template = Template(name='root')
+    entry = Template(name='entry', parent=template)
+    Template(name='value', parent=entry).size = 2
+    entry.count = 3
+    with pytest.raises(RuntimeError):
+        compiler.compile(template)
+
+
+def test_compile_template_with_data_dependent_count(compiler):
+    template = Template(name='root')
+    Template(name='count', parent=template).size = 1
+    entry = Template(name='entry', parent=template)
+    Template(name='value', parent=entry).size = 2
+    entry.count_property = ReferenceProperty(entry, 'count')
+    with pytest.raises(RuntimeError):
+        compiler.compile(template)
+
+
+def test_compile_template_with_signature(compiler):
+    template = Template(name='root')
+    magic = Template(name='magic', parent=template)
+    magic.size = 2
+    magic.signature = bytes([0x01, 0x02])
+    with pytest.raises(RuntimeError):
+        compiler.compile(template)
+
+
+def test_compiled_parsers_of_same_shape_and_different_size(compiler):
+    first = Template(name='root')
+    Template(name='value', parent=first).size = 2
+    second = Template(name='root')
+    Template(name='value', parent=second).size = 2
+    second.boundary = 8
+    assert compiler.compile(first).size == 2
+    assert compiler.compile(second).size == 8
+
+
+def test_compiled_parser_of_template_with_offset(compiler):
+    data = bytes(range(8))
+    template = Template(name='root')
+    template.offset = 4
+    Template(name='x', parent=template).size = 2
+    binalyzer = Binalyzer(template, io.BytesIO(data))
+    parser = compiler.compile(binalyzer.template)
+    assert parser.address == 4
+    assert parser.parse(data) == _interpret(binalyzer.template)
+    assert parser.parse(data[4:6], 0) == {'x': 0x0504}
+    with pytest.raises(RuntimeError):
+        parser.parse(data[:5])
@@ -4,3 +4,427 @@
 
     This module implements tests for the data provider module.
 """
+import io
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from binalyzer_core import (
+    Binalyzer,
+    Template,
+    DataProviderBase,
+    DataProvider,
+    MmapDataProvider,
+    PositionalDataProvider,
+    CachedDataProvider,
+    OverlayDataProvider,
+    WriteBackDataProvider,
+)
+
+
+@pytest.fixture
+def template():
+    root = Template(name='root')
+    Template(name='a', parent=root).size = 2
+    Template(name='b', parent=root).size = 4
+    return root
+
+
+def test_read_at():
+    data_provider = DataProvider(io.BytesIO(bytes(range(8))))
+    assert data_provider.read_at(2, 3) == bytes([2, 3, 4])
+    assert data_provider.data.tell() == 0
+
+
+def test_read_view_of_bytesio(template):
+    data = io.BytesIO(bytes(range(6)))
+    binalyzer = Binalyzer(template, data)
+    view = binalyzer.template.b.view
+    assert isinstance(view, memoryview)
+    assert view == bytes([2, 3, 4, 5])
+    view[0] = 0xFF
+    view.release()
+    assert data.getvalue()[2] == 0xFF
+
+
+def test_read_view_of_bytearray(template):
+    data = bytearray(range(6))
+    template.binding_context.data_provider = DataProvider(data)
+    view = template.b.view
+    data[3] = 0xFF
+    assert view == bytes([2, 0xFF, 4, 5])
+
+
+def test_read_view_of_stream(template):
+    class Stream(io.RawIOBase):
+        def __init__(self, value):
+            self._data = io.BytesIO(value)
+
+        def seek(self, offset, whence=0):
+            return self._data.seek(offset, whence)
+
+        def read(self, size=-1):
+            return self._data.read(size)
+
+    template.binding_context.data_provider = DataProvider(
+        Stream(bytes(range(6))))
+    assert template.b.view == bytes([2, 3, 4, 5])
+
+
+def test_mmap_data_provider_read(tmp_path, template):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes(range(6)))
+    with MmapDataProvider(path) as data_provider:
+        binalyzer = Binalyzer(template, data_provider)
+        assert data_provider.size == 6
+        assert binalyzer.template.a.value == bytes([0, 1])
+        assert binalyzer.template.b.view == bytes([2, 3, 4, 5])
+        with pytest.raises(RuntimeError):
+            binalyzer.template.a.value = bytes([0xFF, 0xFF])
+
+
+def test_mmap_data_provider_write(tmp_path, template):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes(4))
+    with open(path, 'r+b') as file:
+        with MmapDataProvider(file, writable=True) as data_provider:
+            binalyzer = Binalyzer(template, data_provider)
+            binalyzer.template.b.value = bytes([1, 2, 3, 4])
+            assert data_provider.size == 6
+    assert path.read_bytes() == bytes([0, 0, 1, 2, 3, 4])
+
+
+def test_mmap_data_provider_without_template(tmp_path):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes(range(16)))
+    with MmapDataProvider(str(path)) as data_provider:
+        binalyzer = Binalyzer(data=data_provider)
+        assert binalyzer.template.size == 16
+
+
+def test_mmap_data_provider_extends_file_lazily(tmp_path, template):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes([1, 2, 3]))
+    with MmapDataProvider(path) as data_provider:
+        binalyzer = Binalyzer(template, data_provider)
+        assert binalyzer.template.b.value == bytes([3, 0, 0, 0])
+        assert binalyzer.template.b.view == bytes([3, 0, 0, 0])
+        assert data_provider.size == 6
+    with MmapDataProvider(path, writable=True) as data_provider:
+        binalyzer = Binalyzer(template, data_provider)
+        assert binalyzer.template.b.value == bytes([3, 0, 0, 0])
+        assert path.read_bytes() == bytes([1, 2, 3])
+        binalyzer.template.b.value = bytes([4, 5, 6, 7])
+    assert path.read_bytes() == bytes([1, 2, 4, 5, 6, 7])
+
+
+def test_mmap_data_provider_of_empty_file(tmp_path):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(b'')
+    with pytest.raises(RuntimeError):
+        MmapDataProvider(path)
+
+
+def test_data_provider_ensure_size():
+    data_provider = DataProvider(io.BytesIO(bytes([1, 2])))
+    data_provider.ensure_size(4)
+    assert data_provider.size == 4
+    assert data_provider.data.getvalue() == bytes([1, 2])
+    assert data_provider.read_at(1, 4) == bytes([2, 0, 0])
+    data_provider.flush()
+    assert data_provider.data.getvalue() == bytes([1, 2, 0, 0])
+
+
+def test_data_provider_write_beyond_data():
+    data_provider = DataProvider(io.BytesIO(bytes([1, 2])))
+    data_provider.ensure_size(8)
+    data_provider.write_at(4, bytes([3]))
+    assert data_provider.data.getvalue() == bytes([1, 2, 0, 0, 3])
+    assert data_provider.size == 8
+
+
+def test_binalyzer_template_extends_data_lazily(template):
+    data = io.BytesIO(bytes([1, 2]))
+    binalyzer = Binalyzer(template, data)
+    assert binalyzer.template.b.value == bytes(4)
+    assert binalyzer.template.b.view == bytes(4)
+    assert data.getvalue() == bytes([1, 2, 0, 0, 0, 0])
+
+
+def test_binalyzer_data_of_read_only_file(tmp_path, template):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes([1, 2]))
+    with open(path, 'rb') as file:
+        binalyzer = Binalyzer(template, file)
+        assert binalyzer.template.b.value == bytes(4)
+        assert binalyzer.data is file
+    assert path.read_bytes() == bytes([1, 2])
+
+
+def test_binalyzer_flush(template):
+    data = bytearray([1, 2])
+    binalyzer = Binalyzer(template)
+    binalyzer.data_provider = PositionalDataProvider(data)
+    assert binalyzer.template.b.value == bytes(4)
+    assert binalyzer.data == bytearray([1, 2])
+    binalyzer.flush()
+    assert data == bytearray([1, 2, 0, 0, 0, 0])
+
+
+def test_positional_data_provider_of_file(tmp_path, template):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes(range(6)))
+    with open(path, 'r+b') as file:
+        file.seek(1)
+        data_provider = PositionalDataProvider(file)
+        binalyzer = Binalyzer(template, data_provider)
+        assert binalyzer.template.b.value == bytes([2, 3, 4, 5])
+        binalyzer.template.a.value = bytes([0xFF, 0xFE])
+        assert file.tell() == 1
+    assert path.read_bytes()[:2] == bytes([0xFF, 0xFE])
+
+
+def test_positional_data_provider_extends_file_lazily(tmp_path, template):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes([1, 2, 3]))
+    with open(path, 'rb') as file:
+        binalyzer = Binalyzer(template, PositionalDataProvider(file))
+        assert binalyzer.template.b.value == bytes([3, 0, 0, 0])
+        assert binalyzer.data_provider.size == 6
+    assert path.read_bytes() == bytes([1, 2, 3])
+    with open(path, 'r+b') as file:
+        binalyzer = Binalyzer(template, PositionalDataProvider(file))
+        assert binalyzer.template.b.value == bytes([3, 0, 0, 0])
+        assert path.read_bytes() == bytes([1, 2, 3])
+        binalyzer.template.a.value = bytes([0xFF, 0xFE])
+        binalyzer.data_provider.flush()
+    assert path.read_bytes() == bytes([0xFF, 0xFE, 3, 0, 0, 0])
+
+
+@pytest.mark.parametrize('data', [
+    bytes(range(6)),
+    bytearray(range(6)),
+    io.BytesIO(bytes(range(6))),
+])
+def test_positional_data_provider_of_buffer(data):
+    data_provider = PositionalDataProvider(data)
+    assert data_provider.size == 6
+    assert data_provider.read_at(2, 4) == bytes([2, 3, 4, 5])
+
+
+def test_positional_data_provider_extends_buffer(template):
+    data = bytearray(2)
+    template.binding_context.data_provider = PositionalDataProvider(data)
+    template.b.value = bytes([1, 2, 3, 4])
+    assert data == bytearray([0, 0, 1, 2, 3, 4])
+
+
+def test_positional_data_provider_writes_beyond_bytesio():
+    data_provider = PositionalDataProvider(io.BytesIO(bytes(4)))
+    data_provider.write_at(2, bytes([1, 2, 3, 4]))
+    assert data_provider.data.getvalue() == bytes([0, 0, 1, 2, 3, 4])
+
+
+def test_positional_data_provider_extends_bytesio_lazily(template):
+    data = io.BytesIO(bytes([1, 2, 3]))
+    binalyzer = Binalyzer(template)
+    binalyzer.data_provider = PositionalDataProvider(data)
+    assert binalyzer.template.b.value == bytes([3, 0, 0, 0])
+    assert binalyzer.data_provider.size == 6
+    assert data.getvalue() == bytes([1, 2, 3])
+    binalyzer.data_provider.flush()
+    assert data.getvalue() == bytes([1, 2, 3, 0, 0, 0])
+
+
+def test_positional_data_provider_concurrent_reads(tmp_path):
+    root = Template(name='root')
+    field = Template(name='field', parent=root)
+    field.size = 4
+    field.count = 256
+    path = tmp_path / 'image.bin'
+    path.write_bytes(b''.join(i.to_bytes(4, 'little') for i in range(256)))
+    with open(path, 'rb') as file:
+        binalyzer = Binalyzer(root, PositionalDataProvider(file))
+        fields = binalyzer.template.field
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(executor.map(lambda field: field.value, fields))
+    assert values == [i.to_bytes(4, 'little') for i in range(256)]
+
+
+def test_cached_data_provider_read():
+    data_provider = CachedDataProvider(
+        DataProvider(io.BytesIO(bytes(range(64)))), block_size=16)
+    assert data_provider.read_at(10, 12) == bytes(range(10, 22))
+    assert (data_provider.hits, data_provider.misses) == (0, 2)
+    assert data_provider.read_at(18, 2) == bytes([18, 19])
+    assert (data_provider.hits, data_provider.misses) == (1, 2)
+    assert data_provider.read_at(60, 8) == bytes(range(60, 64))
+
+
+def test_cached_data_provider_evicts_least_recently_used_blocks():
+    data_provider = CachedDataProvider(
+        DataProvider(io.BytesIO(bytes(range(64)))),
+        block_size=16, cache_size=32)
+    data_provider.read_at(0, 1)
+    data_provider.read_at(16, 1)
+    data_provider.read_at(0, 1)
+    data_provider.read_at(32, 1)
+    data_provider.read_at(0, 1)
+    assert (data_provider.hits, data_provider.misses) == (2, 3)
+    data_provider.read_at(16, 1)
+    assert (data_provider.hits, data_provider.misses) == (2, 4)
+
+
+def test_cached_data_provider_write(template):
+    data = io.BytesIO(bytes(6))
+    data_provider = CachedDataProvider(DataProvider(data), block_size=4)
+    binalyzer = Binalyzer(template, data_provider)
+    dom = binalyzer.template
+    assert dom.b.value == bytes(4)
+    dom.b.value = bytes([1, 2, 3, 4])
+    assert dom.b.value == bytes([1, 2, 3, 4])
+    assert data.getvalue() == bytes([0, 0, 1, 2, 3, 4])
+
+
+def test_cached_data_provider_write_extends_data():
+    data = io.BytesIO(bytes(range(6)))
+    data_provider = CachedDataProvider(DataProvider(data), block_size=4)
+    assert data_provider.read_at(4, 4) == bytes([4, 5])
+    data_provider.ensure_size(8)
+    assert data_provider.read_at(4, 4) == bytes([4, 5, 0, 0])
+
+
+def test_read_many_merges_ranges():
+    class CountingDataProvider(DataProvider):
+        reads = 0
+
+        def read_at(self, address, size):
+            self.reads += 1
+            return super(CountingDataProvider, self).read_at(address, size)
+
+    data_provider = CountingDataProvider(io.BytesIO(bytes(range(256))))
+    root = Template(name='root')
+    for (name, offset) in (('a', 0), ('b', 2), ('c', 8), ('d', 200)):
+        field = Template(name=name, parent=root)
+        field.offset = offset
+        field.size = 2
+    root.binding_context.data_provider = data_provider
+    templates = [root.d, root.c, root.a, root.b]
+    values = data_provider.read_many(templates, gap=8)
+    assert values == [bytes([200, 201]), bytes([8, 9]),
+                      bytes([0, 1]), bytes([2, 3])]
+    assert data_provider.reads == 2
+    data_provider.read_many(templates, gap=0)
+    assert data_provider.reads == 2 + 3
+
+
+def test_read_at_of_custom_data_provider():
+    class StreamDataProvider(DataProviderBase):
+
+        def __init__(self, data):
+            self._data = data
+
+        @property
+        def data(self):
+            return self._data
+
+        def read(self, template):
+            self._data.seek(template.absolute_address)
+            return self._data.read(template.size)
+
+    template = Template(name='root')
+    magic = Template(name='magic', parent=template)
+    magic.size = 2
+    magic.signature = bytes([0x01, 0x02])
+    binalyzer = Binalyzer(template, io.BytesIO(bytes([0x01, 0x02])))
+    binalyzer.data_provider = StreamDataProvider(
+        io.BytesIO(bytes([0x01, 0x02])))
+    assert binalyzer.template.magic.value == bytes([0x01, 0x02])
+    assert binalyzer.data_provider.read_many([binalyzer.template.magic]) == [
+        bytes([0x01, 0x02]),
+    ]
+
+
+def test_read_all_leaves(template):
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(range(6))))
+    assert binalyzer.template.read_all_leaves() == [
+        bytes([0, 1]),
+        bytes([2, 3, 4, 5]),
+    ]
+
+
+def test_write_back_data_provider(template):
+    class CountingDataProvider(DataProvider):
+        writes = []
+
+        def write_at(self, address, value):
+            self.writes.append(address)
+            super(CountingDataProvider, self).write_at(address, value)
+
+    data = io.BytesIO(bytes(8))
+    with WriteBackDataProvider(CountingDataProvider(data)) as data_provider:
+        binalyzer = Binalyzer(template, data_provider)
+        dom = binalyzer.template
+        dom.b.value = bytes([1, 2, 3, 4])
+        dom.a.value = bytes([5, 6])
+        data_provider.write_at(7, bytes([7]))
+        assert data_provider.dirty
+        assert dom.a.value == bytes([5, 6])
+        assert data.getvalue() == bytes(8)
+    assert not data_provider.dirty
+    assert data_provider.data_provider.writes == [0, 7]
+    assert data.getvalue() == bytes([5, 6, 1, 2, 3, 4, 0, 7])
+
+
+def test_write_back_data_provider_beyond_data():
+    data = io.BytesIO(bytes(2))
+    data_provider = WriteBackDataProvider(DataProvider(data))
+    data_provider.write_at(4, bytes([1, 2]))
+    assert data_provider.size == 6
+    assert data_provider.read_at(0, 6) == bytes([0, 0, 0, 0, 1, 2])
+
+
+def test_write_back_data_provider_flushes_full_buffer():
+    data = io.BytesIO(bytes(8))
+    data_provider = WriteBackDataProvider(DataProvider(data), buffer_size=4)
+    data_provider.write_at(0, bytes([1, 2]))
+    assert data.getvalue()[:2] == bytes(2)
+    data_provider.write_at(4, bytes([3, 4]))
+    assert data.getvalue() == bytes([1, 2, 0, 0, 3, 4, 0, 0])
+
+
+def test_overlay_data_provider(tmp_path, template):
+    base = bytes(range(6))
+    data_provider = OverlayDataProvider(base)
+    binalyzer = Binalyzer(template, data_provider)
+    binalyzer.template.a.value = bytes([0xFF, 0xFE])
+    assert binalyzer.template.a.value == bytes([0xFF, 0xFE])
+    assert binalyzer.template.b.value == bytes([2, 3, 4, 5])
+    assert data_provider.patches == [(0, bytes([0xFF, 0xFE]))]
+    assert base == bytes(range(6))
+    path = tmp_path / 'patched.bin'
+    data_provider.save_to(path, chunk_size=4)
+    assert path.read_bytes() == bytes([0xFF, 0xFE, 2, 3, 4, 5])
+
+
+def test_overlay_data_provider_of_read_only_file(tmp_path, template):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(bytes(range(4)))
+    with MmapDataProvider(path) as base:
+        data_provider = OverlayDataProvider(base)
+        binalyzer = Binalyzer(template, data_provider)
+        binalyzer.template.b.value = bytes([1, 1, 1, 1])
+        assert data_provider.size == 6
+        output = io.BytesIO()
+        data_provider.save_to(output)
+    assert output.getvalue() == bytes([0, 1, 1, 1, 1, 1])
+    assert path.read_bytes() == bytes(range(4))
+
+
+def test_zeroed_data_provider_of_large_template():
+    root = Template(name='root')
+    root.size = 1 << 30
+    binalyzer = Binalyzer(root, io.BytesIO())
+    assert binalyzer.template.size == 1 << 30
+    assert binalyzer.data_provider.size == 1 << 30
+    assert binalyzer.data_provider.read_at((1 << 30) - 2, 4) == bytes(2)
@@ -0,0 +1,80 @@
+"""
+    test_ndarray
+    ~~~~~~~~~~~~
+
+    This module implements tests for the ndarray module.
+"""
+import io
+import pytest
+
+from binalyzer_core import (
+    Binalyzer,
+    BindingEngine,
+    Template,
+)
+from binalyzer_core.ndarray import (
+    to_dtype,
+    as_array,
+)
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def template():
+    root = Template(name='root')
+    entry = Template(name='entry', parent=root)
+    Template(name='x', parent=entry).size = 2
+    y = Template(name='y', parent=entry)
+    y.size = 4
+    y.boundary = 4
+    Template(name='z', parent=entry).size = 3
+    entry.padding_after = 1
+    entry.count = 4
+    return root
+
+
+def test_to_dtype(template):
+    dtype = to_dtype(Binalyzer(template).template.entry[0])
+    assert dtype.names == ('x', 'y', 'z')
+    assert dtype.fields['x'] == (np.dtype('<u2'), 0)
+    assert dtype.fields['y'] == (np.dtype('<u4'), 4)
+    assert dtype.fields['z'] == (np.dtype('V3'), 8)
+    assert dtype.itemsize == 11
+
+
+def test_to_dtype_big_endian(template):
+    dtype = to_dtype(Binalyzer(template).template.entry[0], 'big')
+    assert dtype.fields['y'] == (np.dtype('>u4'), 4)
+
+
+def test_as_array(template):
+    data = io.BytesIO(bytes(range(48)))
+    binalyzer = Binalyzer(template, data)
+    entries = binalyzer.template.entry
+    array = as_array(entries)
+    assert len(array) == 4
+    assert list(array['x']) == [
+        int.from_bytes(entry.x.value, 'little') for entry in entries
+    ]
+    assert list(array['y']) == [
+        int.from_bytes(entry.y.value, 'little') for entry in entries
+    ]
+    del array
+
+
+def test_as_array_of_virtual_array(template):
+    data = io.BytesIO(bytes(range(48)))
+    binalyzer = Binalyzer(template, data)
+    binalyzer.binding_engine = BindingEngine(virtual_array_threshold=2)
+    array = as_array(binalyzer.template.entry)
+    assert list(array['x']) == [0x0100, 0x0d0c, 0x1918, 0x2524]
+
+
+def test_as_array_is_a_view(template):
+    data = io.BytesIO(bytes(48))
+    binalyzer = Binalyzer(template, data)
+    array = as_array(binalyzer.template.entry)
+    array['x'][1] = 0x0201
+    del array
+    assert data.getvalue()[12:14] == bytes([0x01, 0x02])
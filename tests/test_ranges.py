@@ -0,0 +1,53 @@
+"""
+    test_ranges
+    ~~~~~~~~~~~
+
+    This module implements tests for the ranges module.
+"""
+from binalyzer_core.ranges import RangeBuffer
+
+
+def test_write_disjoint_ranges():
+    ranges = RangeBuffer()
+    ranges.write(8, bytes([1, 2]))
+    ranges.write(0, bytes([3]))
+    assert list(ranges) == [(0, bytes([3])), (8, bytes([1, 2]))]
+    assert ranges.size == 3
+    assert ranges.end == 10
+
+
+def test_write_merges_adjacent_ranges():
+    ranges = RangeBuffer()
+    ranges.write(0, bytes([1, 2]))
+    ranges.write(2, bytes([3, 4]))
+    assert list(ranges) == [(0, bytes([1, 2, 3, 4]))]
+
+
+def test_write_merges_overlapping_ranges():
+    ranges = RangeBuffer()
+    ranges.write(0, bytes([1, 1]))
+    ranges.write(4, bytes([2, 2]))
+    ranges.write(8, bytes([3, 3]))
+    ranges.write(1, bytes([4, 4, 4, 4, 4]))
+    assert list(ranges) == [
+        (0, bytes([1, 4, 4, 4, 4, 4])),
+        (8, bytes([3, 3])),
+    ]
+
+
+def test_overlay():
+    ranges = RangeBuffer()
+    ranges.write(2, bytes([0xFF, 0xFF]))
+    ranges.write(7, bytes([0xEE, 0xEE]))
+    assert ranges.overlay(0, bytes(range(6)), 6) == bytes([0, 1, 0xFF, 0xFF, 4, 5])
+    assert ranges.overlay(3, bytes([3, 4, 5]), 3) == bytes([0xFF, 4, 5])
+    assert ranges.overlay(4, bytes([4, 5]), 6) == bytes([4, 5, 0, 0xEE, 0xEE])
+    assert ranges.overlay(10, b'', 2) == b''
+
+
+def test_clear():
+    ranges = RangeBuffer()
+    ranges.write(0, bytes([1]))
+    ranges.clear()
+    assert len(ranges) == 0
+    assert ranges.end == 0
@@ -0,0 +1,51 @@
+"""
+    test_sparse
+    ~~~~~~~~~~~
+
+    This module implements tests for the sparse module.
+"""
+import io
+
+from binalyzer_core.sparse import SparseBuffer
+
+
+def test_read_unallocated():
+    buffer = SparseBuffer(10, 0xFF, page_size=4)
+    assert buffer.read() == bytes([0xFF] * 10)
+    assert buffer.read() == b''
+
+
+def test_write_and_read_across_pages():
+    buffer = SparseBuffer(12, page_size=4)
+    buffer.seek(3)
+    assert buffer.write(bytes([1, 2, 3, 4, 5, 6])) == 6
+    assert buffer.tell() == 9
+    assert buffer.getvalue() == bytes([0, 0, 0, 1, 2, 3, 4, 5, 6, 0, 0, 0])
+    buffer.seek(2)
+    assert buffer.read(3) == bytes([0, 1, 2])
+
+
+def test_write_beyond_end():
+    buffer = SparseBuffer(2, 0xAA, page_size=4)
+    buffer.seek(0, io.SEEK_END)
+    buffer.seek(3, io.SEEK_CUR)
+    buffer.write(bytes([1]))
+    assert buffer.getvalue() == bytes([0xAA] * 5 + [1])
+
+
+def test_truncate():
+    buffer = SparseBuffer(8, page_size=4)
+    buffer.write(bytes([1] * 8))
+    buffer.truncate(2)
+    assert buffer.getvalue() == bytes([1, 1])
+    buffer.truncate(6)
+    assert buffer.getvalue() == bytes([1, 1, 0, 0, 0, 0])
+
+
+def test_large_buffer_is_not_allocated():
+    buffer = SparseBuffer(1 << 40)
+    buffer.seek((1 << 40) - 2)
+    buffer.write(bytes([1, 2]))
+    buffer.seek(-4, io.SEEK_END)
+    assert buffer.read() == bytes([0, 0, 1, 2])
+    assert len(buffer._pages) == 1
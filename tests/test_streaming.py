@@ -0,0 +1,82 @@
+"""
+    test_streaming
+    ~~~~~~~~~~~~~~
+
+    This module implements tests for the streaming module.
+"""
+import io
+import pytest
+
+from binalyzer_core import (
+    Template,
+    ReferenceProperty,
+    StretchSizeProperty,
+    StreamDataProvider,
+    stream_records,
+)
+
+
+class ForwardOnlyStream(object):
+
+    def __init__(self, value, chunk_size=3):
+        self._data = io.BytesIO(value)
+        self._chunk_size = chunk_size
+
+    def read(self, size=-1):
+        # Returns short reads like a pipe does.
+        return self._data.read(min(size, self._chunk_size))
+
+
+@pytest.fixture
+def template():
+    record = Template(name='record')
+    length = Template(name='length', parent=record)
+    length.size = 1
+    payload = Template(name='payload', parent=record)
+    payload.size_property = ReferenceProperty(payload, 'length')
+    return record
+
+
+def test_stream_records(template):
+    stream = ForwardOnlyStream(bytes([2, 0xA, 0xB, 0, 3, 1, 2, 3]))
+    records = list(stream_records(template, stream, chunk_size=1))
+    assert len(records) == 3
+    assert [record.payload.value for record in records] == [
+        bytes([0xA, 0xB]), b'', bytes([1, 2, 3]),
+    ]
+    assert records[2].value == bytes([3, 1, 2, 3])
+
+
+def test_stream_records_of_empty_stream(template):
+    assert list(stream_records(template, io.BytesIO())) == []
+
+
+def test_stream_records_of_truncated_stream(template):
+    stream = ForwardOnlyStream(bytes([2, 0xA, 0xB, 3, 1]))
+    records = stream_records(template, stream)
+    assert next(records).payload.value == bytes([0xA, 0xB])
+    with pytest.raises(RuntimeError):
+        next(records)
+
+
+def test_stream_records_does_not_modify_template(template):
+    list(stream_records(template, io.BytesIO(bytes([1, 0xA]))))
+    assert template.binding_context.data_provider.data is not None
+    assert not isinstance(template.binding_context.data_provider,
+                          StreamDataProvider)
+
+
+def test_stream_records_with_stretched_size():
+    record = Template(name='record')
+    record.size_property = StretchSizeProperty(record)
+    with pytest.raises(RuntimeError):
+        list(stream_records(record, io.BytesIO(bytes(4))))
+
+
+def test_stream_data_provider_buffers_forward_only():
+    data_provider = StreamDataProvider(ForwardOnlyStream(bytes(range(10))),
+                                       chunk_size=2)
+    assert data_provider.read_at(1, 2) == bytes([1, 2])
+    assert data_provider.buffered_size == 3
+    assert data_provider.discard(2) == bytes([0, 1])
+    assert data_provider.read_at(0, 2) == bytes([2, 3])
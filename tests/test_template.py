@@ -7,6 +7,7 @@
 import unittest
 import pytest
 import io
+import pickle
 
 from binalyzer_core import (
     Binalyzer,
@@ -14,7 +15,9 @@ from binalyzer_core import (
     ValueProperty,
     RelativeOffsetValueProperty,
     AutoSizeValueProperty,
-    BackedBindingContext
+    BackedBindingContext,
+    ReferenceProperty,
+    StretchSizeProperty,
 )
 
 
@@ -215,4 +218,217 @@ def test_size_attribute_overrides_size_of_text_assignment():
     assert template_b.text == bytes([0x02] * 4)
     assert template_b.value == bytes([0x04] * 4)
     assert template_b.size == 4
-    assert binalyzer.template.size == 8
\ No newline at end of file
+    assert binalyzer.template.size == 8
+
+
+def test_sibling_index():
+    template_a = Template(name='a')
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_a)
+    template_d = Template(name='d', parent=template_a)
+    assert template_a.sibling_index == 0
+    assert template_b.sibling_index == 0
+    assert template_c.sibling_index == 1
+    assert template_d.sibling_index == 2
+
+
+def test_sibling_index_after_reparenting():
+    template_a = Template(name='a')
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_a)
+    template_d = Template(name='d', parent=template_a)
+    template_b.parent = None
+    assert template_c.sibling_index == 0
+    assert template_d.sibling_index == 1
+    template_a.children = [template_d, template_b, template_c]
+    assert template_d.sibling_index == 0
+    assert template_b.sibling_index == 1
+    assert template_c.sibling_index == 2
+
+
+def test_invalidate_cache_keeps_values_of_predecessors():
+    template_a = Template(name='a')
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_a)
+    template_d = Template(name='d', parent=template_a)
+    template_b.size = 1
+    template_c.size = 2
+    template_d.size = 4
+    assert template_a.size == 7
+    assert template_d.offset == 3
+    template_c.size = 3
+    assert template_b.offset_property.value_provider._cached_value == 0
+    assert template_d.offset_property.value_provider._cached_value is None
+    assert template_a.size_property.value_provider._cached_value is None
+    assert template_d.offset == 4
+    assert template_a.size == 8
+
+
+def test_invalidate_cache_of_nested_template():
+    template_a = Template(name='a')
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_b)
+    template_d = Template(name='d', parent=template_a)
+    template_e = Template(name='e', parent=template_d)
+    template_c.size = 1
+    template_e.size = 2
+    assert template_e.absolute_address == 1
+    assert template_a.size == 3
+    template_c.padding_before = 2
+    assert template_e.absolute_address == 3
+    assert template_a.size == 5
+
+
+def test_invalidate_cache_on_child_removal():
+    template_a = Template(name='a')
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_a)
+    template_d = Template(name='d', parent=template_a)
+    template_b.size = 1
+    template_c.size = 2
+    template_d.size = 4
+    assert template_a.size == 7
+    assert template_d.offset == 3
+    template_c.parent = None
+    assert template_d.offset == 1
+    assert template_a.size == 5
+
+
+def test_invalidate_cache_of_referencing_template():
+    binalyzer = Binalyzer(Template(), io.BytesIO(bytes([0x02, 0x00, 0x00, 0x00])))
+    template_a = binalyzer.template
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_a)
+    template_b.size = 1
+    template_c.size_property = ReferenceProperty(template_c, 'b')
+    assert template_c.size == 2
+    assert template_a.size == 3
+    template_b.value = bytes([0x03])
+    assert template_c.size == 3
+    assert template_a.size == 4
+
+
+def test_invalidate_cache_of_wide_array():
+    template = Template(name='root')
+    element = Template(name='e', parent=template)
+    element.count = 2000
+    Template(name='a', parent=element).size = 2
+    Template(name='b', parent=element).size = 2
+    binalyzer = Binalyzer(template, io.BytesIO(bytes(8000)))
+    dom = binalyzer.template
+    dom.e[5].a.size = 3
+    assert dom.size == 8001
+    assert dom.e[-1].b.absolute_address == 7999
+
+
+def test_absolute_address_cache():
+    template_a = Template(name='a')
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_a)
+    template_d = Template(name='d', parent=template_c)
+    template_b.size = 2
+    template_d.size = 1
+    assert template_d.absolute_address == 2
+    assert template_d._absolute_address == 2
+    assert template_c._absolute_address == 2
+    template_b.size = 4
+    assert template_d._absolute_address is None
+    assert template_d.absolute_address == 4
+
+
+def test_unpack():
+    binalyzer = Binalyzer(Template(), io.BytesIO(bytes(range(16))))
+    template = binalyzer.template
+    Template(name='a', parent=template).size = 2
+    Template(name='b', parent=template).size = 3
+    c = Template(name='c', parent=template)
+    c.size = 4
+    c.padding_before = 1
+    d = Template(name='d', parent=template)
+    Template(name='e', parent=d).size = 1
+    Template(name='f', parent=d).size = 1
+    assert template.unpack() == (
+        0x0100, bytes([0x02, 0x03, 0x04]), 0x09080706, 0x0a, 0x0b
+    )
+    assert template.unpack('big') == (
+        0x0001, bytes([0x02, 0x03, 0x04]), 0x06070809, 0x0a, 0x0b
+    )
+
+
+def test_unpack_leaf():
+    binalyzer = Binalyzer(Template(), io.BytesIO(bytes(range(16))))
+    template = binalyzer.template
+    template.offset = 4
+    template.size = 2
+    assert template.unpack() == (0x0504,)
+
+
+def _create_pickled_template():
+    root = Template(name='root')
+    header = Template(name='header', parent=root)
+    header.size = 1
+    header.signature = bytes([0x7F])
+    payload = Template(name='payload', parent=root)
+    payload.size_property = ReferenceProperty(payload, 'header')
+    payload.boundary = 4
+    field = Template(name='field', parent=root)
+    field.size = 2
+    field.count = 3
+    field.padding_before = 1
+    tail = Template(name='tail', parent=root)
+    tail.offset = 16
+    tail.size_property = StretchSizeProperty(tail)
+    return root
+
+
+def test_pickle_template():
+    template = pickle.loads(pickle.dumps(_create_pickled_template()))
+    assert [child.name for child in template.children] == [
+        'header', 'payload', 'field', 'tail',
+    ]
+    assert template.header.signature == bytes([0x7F])
+    assert isinstance(template.payload.size_property, ReferenceProperty)
+    assert template.payload.boundary == 4
+    assert template.field.count == 3
+    assert template.field.padding_before == 1
+    assert template.tail.offset == 16
+    assert isinstance(template.tail.size_property, StretchSizeProperty)
+    assert template.header.binding_context is template.binding_context
+
+
+def test_pickled_template_binds_like_original():
+    data = bytes([0x7F, 0x02] + list(range(30)))
+    expected = Binalyzer(_create_pickled_template(), io.BytesIO(data))
+    template = pickle.loads(pickle.dumps(_create_pickled_template()))
+    actual = Binalyzer(template, io.BytesIO(data))
+    assert ([(t.name, t.absolute_address, t.size)
+             for t in actual.template.descendants] ==
+            [(t.name, t.absolute_address, t.size)
+             for t in expected.template.descendants])
+
+
+def test_pickle_bound_template():
+    data = bytes([0x7F, 0x02] + list(range(30)))
+    binalyzer = Binalyzer(_create_pickled_template(), io.BytesIO(data))
+    template = pickle.loads(pickle.dumps(binalyzer.template))
+    assert [element.name for element in template.field] == [
+        'field-0', 'field-1', 'field-2',
+    ]
+    assert template.field[1] is template.children[3]
+    assert template.field[1].count == 1
+    assert template.field[1].size == 2
+
+
+def test_pickle_bound_template_drops_data():
+    data = bytes([0x7F, 0x02] + list(range(30)))
+    binalyzer = Binalyzer(_create_pickled_template(), io.BytesIO(data))
+    template = pickle.loads(pickle.dumps(binalyzer.template))
+    assert template.binding_context is not binalyzer.template.binding_context
+    assert template.field[1].size == binalyzer.template.field[1].size
+    assert Binalyzer(template).template.children[3].value == bytes(2)
+
+
+def test_pickle_child_template():
+    template = pickle.loads(pickle.dumps(_create_pickled_template().header))
+    assert template.parent is None
+    assert template.name == 'header'
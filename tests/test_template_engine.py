@@ -150,3 +150,33 @@ def test_get_multiple_of_boundary_when_value_on_boundary(engine):
 
 def test_get_multiple_of_boundary_when_value_off_boundary(engine):
     assert engine._get_multiple_of_boundary(0x470, 0x100) == 0x500
+
+
+def test_layout_resolves_offsets_sizes_and_addresses(engine):
+    template_a = Template(name='a')
+    template_a.offset = 0x10
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_b)
+    template_d = Template(name='d', parent=template_b)
+    template_e = Template(name='e', parent=template_a)
+    template_c.size = 1
+    template_d.size = 2
+    template_e.size = 4
+    template_e.boundary = 4
+    addresses = engine.layout(template_a)
+    assert addresses[template_a] == 0x10
+    assert addresses[template_c] == 0x10
+    assert addresses[template_d] == 0x11
+    assert addresses[template_e] == 0x14
+    assert template_b.size_property.value_provider._cached_value == 3
+    assert template_e.offset_property.value_provider._cached_value == 4
+    assert template_a.size_property.value_provider._cached_value == 8
+
+
+def test_layout_of_wide_template(engine):
+    template_a = Template(name='a')
+    for _ in range(2000):
+        Template(parent=template_a).size = 2
+    engine.layout(template_a)
+    assert template_a.size == 4000
+    assert template_a.children[-1].offset == 3998
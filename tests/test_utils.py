@@ -0,0 +1,49 @@
+"""
+    test_utils
+    ~~~~~~~~~~
+
+    This module implements tests for the utils module.
+"""
+from anytree import Node
+
+from binalyzer_core import (
+    Template,
+    siblings,
+    leftsibling,
+    rightsibling,
+    leftsiblings,
+    rightsiblings,
+)
+
+
+def test_siblings_of_template():
+    template_a = Template(name='a')
+    template_b = Template(name='b', parent=template_a)
+    template_c = Template(name='c', parent=template_a)
+    template_d = Template(name='d', parent=template_a)
+    assert leftsibling(template_b) is None
+    assert leftsibling(template_c) is template_b
+    assert rightsibling(template_c) is template_d
+    assert rightsibling(template_d) is None
+    assert leftsiblings(template_d) == [template_b, template_c]
+    assert rightsiblings(template_b) == [template_c, template_d]
+    assert siblings(template_c) == [template_b, template_d]
+
+
+def test_siblings_of_root():
+    template = Template(name='a')
+    assert leftsibling(template) is None
+    assert rightsibling(template) is None
+    assert leftsiblings(template) == []
+    assert rightsiblings(template) == []
+
+
+def test_siblings_of_node():
+    node_a = Node('a')
+    node_b = Node('b', parent=node_a)
+    node_c = Node('c', parent=node_a)
+    node_d = Node('d', parent=node_a)
+    assert leftsibling(node_c) is node_b
+    assert rightsibling(node_c) is node_d
+    assert leftsiblings(node_d) == [node_b, node_c]
+    assert rightsiblings(node_b) == [node_c, node_d]